@@ -0,0 +1,345 @@
+"""
+Benchmark indexing, postings codec, dan query boolean dengan collection
+sintetis yang deterministik. Tidak membutuhkan akses network: stopwords
+yang dipakai adalah FUNCTION_WORDS, ditulis ke directory index sebelum
+indexing.
+
+Hasil bergantung pada mesin, sehingga baseline tidak disertakan di
+repository. Buat baseline sekali di mesin yang dipakai untuk mengukur:
+
+    python benchmark.py --save-baseline
+
+lalu setiap run berikutnya dengan config yang sama dibandingkan dengan
+benchmark_baseline.json, dan exit code 1 jika ada metric yang lebih buruk
+dari --tolerance. benchmark_results.json dan benchmark_baseline.json
+khusus untuk mesin tersebut, sehingga keduanya ada di .gitignore.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bsbi import BSBIIndex
+from index import InvertedIndexReader
+from searcher import Searcher
+from compression import VBEPostings, EliasGammaPostings, HybridPostings, SkipVBEPostings, StandardPostings
+from util import STOP_WORDS_FILENAME
+
+CODECS = {codec.__name__: codec for codec in
+          (StandardPostings, VBEPostings, EliasGammaPostings, SkipVBEPostings, HybridPostings)}
+
+# Bagian kata untuk membangkitkan kata-kata yang mirip bahasa Indonesia
+ONSETS = ['', 'b', 'c', 'd', 'g', 'h', 'j', 'k', 'l', 'm', 'n', 'p', 'r', 's', 't', 'w', 'y', 'ng', 'ny']
+VOWELS = ['a', 'i', 'u', 'e', 'o']
+CODAS = ['', '', '', 'n', 'ng', 'r', 't', 'k', 's', 'h']
+PREFIXES = ['me', 'ber', 'di', 'ter', 'pe', 'ke']
+SUFFIXES = ['kan', 'an', 'nya', 'i']
+# Kata fungsi (stopwords) yang menempati rank teratas distribusi Zipf
+FUNCTION_WORDS = ['yang', 'dan', 'di', 'ke', 'dari', 'untuk', 'dengan', 'ini', 'itu', 'pada',
+                  'dalam', 'tidak', 'akan', 'juga', 'oleh']
+
+QUERY_KINDS = ('term', 'and', 'or', 'diff', 'nested')
+
+# Metric yang dibandingkan dengan baseline, berdasarkan nama key terakhirnya
+HIGHER_IS_BETTER = ('docs_per_second', 'mb_per_second', 'encode_mb_per_second', 'decode_mb_per_second')
+LOWER_IS_BETTER = ('bytes_per_posting', 'p50_ms', 'p95_ms', 'p99_ms')
+
+
+def make_vocabulary(rng, size):
+    """Membangkitkan size kata dasar unik yang tersusun dari 2-3 suku kata."""
+    vocabulary = dict.fromkeys(FUNCTION_WORDS)
+    while len(vocabulary) < size:
+        word = ''.join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+                       for _ in range(rng.randint(2, 3)))
+        if len(word) > 3:
+            vocabulary.setdefault(word)
+    return list(vocabulary)
+
+
+def generate_corpus(path, n_docs, n_blocks, vocab_size, zipf_s, doc_length, seed):
+    """
+    Membangkitkan collection sintetis di path: n_blocks sub-directory
+    (block) berisi total n_docs dokumen. Kata-kata diambil dari vocabulary
+    berukuran vocab_size dengan distribusi Zipf (bobot rank r adalah
+    1 / r^zipf_s), sebagian diberi imbuhan supaya stemmer ikut bekerja.
+    Hasilnya deterministik untuk seed yang sama.
+
+    Returns
+    -------
+    List[str]
+        Vocabulary, terurut dari rank tertinggi (paling sering muncul)
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, vocab_size)
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1.0 / rank ** zipf_s
+        cum_weights.append(total)
+
+    for doc in range(n_docs):
+        block_path = os.path.join(path, str(doc % n_blocks))
+        os.makedirs(block_path, exist_ok=True)
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(doc_length // 2, doc_length * 3 // 2))
+        for i, word in enumerate(words):
+            if word not in FUNCTION_WORDS and rng.random() < 0.3:
+                words[i] = rng.choice(PREFIXES) + word if rng.random() < 0.5 else word + rng.choice(SUFFIXES)
+        with open(os.path.join(block_path, f'{doc}.txt'), 'w', encoding='utf-8') as f:
+            f.write(' '.join(words) + '.\n')
+    return vocabulary
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(directory, filename))
+               for directory, _, filenames in os.walk(path) for filename in filenames)
+
+
+def bench_indexing(bsbi_index, n_workers):
+    """
+    Membangun index dan mengukur throughput serta waktu setiap tahapnya
+    (BSBIIndex.stage_times). Dengan n_workers > 1, parsing dikerjakan di
+    worker process sehingga waktu read/wait/parse tidak tercatat.
+    """
+    input_bytes = directory_size(bsbi_index.data_path)
+    start = time.perf_counter()
+    bsbi_index.start_indexing(n_workers=n_workers)
+    seconds = time.perf_counter() - start
+    return {'documents': len(bsbi_index.doc_id_map),
+            'terms': len(bsbi_index.term_id_map),
+            'input_bytes': input_bytes,
+            'index_bytes': sum(os.path.getsize(os.path.join(bsbi_index.output_path, bsbi_index.index_name + ext))
+                               for ext in ('.index', '.dict')),
+            'seconds': seconds,
+            'docs_per_second': len(bsbi_index.doc_id_map) / seconds,
+            'mb_per_second': input_bytes / 1e6 / seconds,
+            'stage_seconds': dict(bsbi_index.stage_times)}
+
+
+def bench_codecs(postings_lists, codecs, repeats):
+    """
+    Mengukur encode/decode setiap codec terhadap postings lists dari index
+    hasil indexing. Throughput dihitung dalam MB postings mentah (4 byte per
+    docID) per detik, dengan waktu terbaik dari repeats kali pengulangan.
+    """
+    n_postings = sum(len(postings_list) for postings_list in postings_lists)
+    raw_mb = 4 * n_postings / 1e6
+    results = {}
+    for name in codecs:
+        codec = CODECS[name]
+        encode_seconds = decode_seconds = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            encoded = [codec.encode(postings_list) for postings_list in postings_lists]
+            encode_seconds = min(encode_seconds, time.perf_counter() - start)
+            start = time.perf_counter()
+            decoded = [codec.decode(encoded_postings) for encoded_postings in encoded]
+            decode_seconds = min(decode_seconds, time.perf_counter() - start)
+        for postings_list, decoded_postings in zip(postings_lists, decoded):
+            assert list(decoded_postings) == list(postings_list), f"{name}: hasil decode tidak sama"
+        results[name] = {'postings': n_postings,
+                         'encoded_bytes': sum(len(encoded_postings) for encoded_postings in encoded),
+                         'bytes_per_posting': sum(len(encoded_postings) for encoded_postings in encoded) / n_postings,
+                         'encode_mb_per_second': raw_mb / encode_seconds,
+                         'decode_mb_per_second': raw_mb / decode_seconds}
+    return results
+
+
+def make_queries(rng, vocabulary, stop_words, n_queries):
+    """
+    Membangkitkan n_queries query boolean dengan jenis yang bergiliran
+    (QUERY_KINDS). Term diambil dari vocabulary (tanpa stopwords) secara
+    merata, sehingga term dengan df tinggi, sedang, dan rendah ikut terpilih.
+    """
+    words = [word for word in vocabulary if word not in stop_words]
+    queries = []
+    for i in range(n_queries):
+        kind = QUERY_KINDS[i % len(QUERY_KINDS)]
+        a, b, c = rng.sample(words, 3)
+        query = {'term': a,
+                 'and': f'{a} AND {b}',
+                 'or': f'{a} OR {b}',
+                 'diff': f'{a} DIFF {b}',
+                 'nested': f'({a} OR {b}) AND {c}'}[kind]
+        queries.append((kind, query))
+    return queries
+
+
+def percentile(sorted_values, p):
+    """Percentile (nearest-rank) dari list yang sudah terurut."""
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    return {'queries': len(latencies),
+            'p50_ms': percentile(latencies, 50) * 1e3,
+            'p95_ms': percentile(latencies, 95) * 1e3,
+            'p99_ms': percentile(latencies, 99) * 1e3}
+
+
+def bench_queries(bsbi_index, queries, repeats):
+    """
+    Mengukur latency setiap query (end-to-end, termasuk parsing) dengan
+    Searcher. Result cache dan postings cache tidak dipakai, supaya setiap
+    query benar-benar dievaluasi. Semua query dijalankan sekali sebagai
+    warm-up sebelum diukur.
+    """
+    latencies = {kind: [] for kind in QUERY_KINDS}
+    with Searcher(bsbi_index) as searcher:
+        for _, query in queries:
+            searcher.retrieve(query)
+        for _ in range(repeats):
+            for kind, query in queries:
+                start = time.perf_counter()
+                searcher.retrieve(query)
+                latencies[kind].append(time.perf_counter() - start)
+    results = {kind: latency_summary(values) for kind, values in latencies.items()}
+    results['all'] = latency_summary([value for values in latencies.values() for value in values])
+    return results
+
+
+def flatten_metrics(results, prefix=''):
+    """Mengambil metric yang dibandingkan dengan baseline sebagai {nama.bertingkat: (nilai, higher_is_better)}."""
+    metrics = {}
+    for key, value in results.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, name + '.'))
+        elif key in HIGHER_IS_BETTER or key in LOWER_IS_BETTER:
+            metrics[name] = (value, key in HIGHER_IS_BETTER)
+    return metrics
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Membandingkan hasil benchmark dengan baseline. Sebuah metric dianggap
+    regresi jika lebih buruk dari baseline lebih dari tolerance (relatif).
+
+    Returns
+    -------
+    List[str]
+        Deskripsi setiap regresi; kosong jika tidak ada
+    """
+    regressions = []
+    baseline_metrics = flatten_metrics({key: baseline[key] for key in ('indexing', 'codecs', 'queries')})
+    for name, (value, higher_is_better) in flatten_metrics(
+            {key: results[key] for key in ('indexing', 'codecs', 'queries')}).items():
+        if name not in baseline_metrics:
+            continue
+        baseline_value = baseline_metrics[name][0]
+        change = (value - baseline_value) / baseline_value if baseline_value else 0.0
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{name}: {value:.4g} (baseline {baseline_value:.4g}, {change:+.1%})")
+    return regressions
+
+
+def run(args):
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bsbi_benchmark_')
+    corpus_path = os.path.join(workdir, 'corpus')
+    index_path = os.path.join(workdir, 'index')
+    try:
+        shutil.rmtree(corpus_path, ignore_errors=True)
+        shutil.rmtree(index_path, ignore_errors=True)
+        os.makedirs(index_path)
+        # Stopwords tetap milik benchmark (dicari di directory index lebih dulu),
+        # sehingga hasil tidak bergantung pada daftar stopwords project
+        with open(os.path.join(index_path, STOP_WORDS_FILENAME), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(FUNCTION_WORDS) + '\n')
+
+        start = time.perf_counter()
+        vocabulary = generate_corpus(corpus_path, args.docs, args.blocks, args.vocab, args.zipf, args.doc_length,
+                                     args.seed)
+        print(f"corpus: {args.docs} dokumen dalam {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+        bsbi_index = BSBIIndex(data_path=corpus_path, output_path=index_path,
+                               postings_encoding=CODECS[args.encoding], result_cache_size=0)
+        indexing = bench_indexing(bsbi_index, args.workers)
+
+        with InvertedIndexReader(bsbi_index.index_name, bsbi_index.postings_encoding, index_path) as index:
+            postings_lists = [list(postings_list) for _, postings_list in index]
+        codecs = bench_codecs(postings_lists, args.codecs, args.repeats)
+
+        queries = make_queries(random.Random(args.seed), vocabulary, bsbi_index.get_stop_words(), args.queries)
+        query_latencies = bench_queries(bsbi_index, queries, args.repeats)
+    finally:
+        if args.workdir is None and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {'config': {'docs': args.docs, 'blocks': args.blocks, 'vocab': args.vocab, 'zipf': args.zipf,
+                       'doc_length': args.doc_length, 'seed': args.seed, 'encoding': args.encoding,
+                       'workers': args.workers, 'queries': args.queries, 'repeats': args.repeats},
+            'environment': {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+                            'machine': platform.machine(), 'system': platform.system()},
+            'indexing': indexing,
+            'codecs': codecs,
+            'queries': query_latencies}
+
+
+def print_summary(results):
+    indexing = results['indexing']
+    print(f"Indexing : {indexing['documents']} dokumen, {indexing['seconds']:.2f}s, "
+          f"{indexing['docs_per_second']:.1f} dokumen/s, {indexing['mb_per_second']:.3f} MB/s")
+    print("           " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in indexing['stage_seconds'].items()))
+    for name, codec in results['codecs'].items():
+        print(f"{name:<19}: {codec['bytes_per_posting']:.3f} byte/posting, "
+              f"encode {codec['encode_mb_per_second']:.2f} MB/s, decode {codec['decode_mb_per_second']:.2f} MB/s")
+    for kind, latency in results['queries'].items():
+        print(f"Query {kind:<13}: p50 {latency['p50_ms']:.3f} ms, p95 {latency['p95_ms']:.3f} ms, "
+              f"p99 {latency['p99_ms']:.3f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark indexing, postings codec, dan query boolean "
+                                                 "dengan collection sintetis")
+    parser.add_argument('--docs', type=int, default=2000, help="banyaknya dokumen")
+    parser.add_argument('--blocks', type=int, default=4, help="banyaknya block (sub-directory)")
+    parser.add_argument('--vocab', type=int, default=20000, help="ukuran vocabulary")
+    parser.add_argument('--zipf', type=float, default=1.1, help="eksponen distribusi Zipf")
+    parser.add_argument('--doc-length', type=int, default=200, help="rata-rata banyaknya kata per dokumen")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--encoding', default='VBEPostings', choices=list(CODECS),
+                        help="postings encoding untuk index yang dibangun")
+    parser.add_argument('--workers', type=int, default=1, help="banyaknya worker process untuk indexing")
+    parser.add_argument('--codecs', nargs='+', default=['StandardPostings', 'VBEPostings', 'EliasGammaPostings'],
+                        choices=list(CODECS), help="codec yang diukur")
+    parser.add_argument('--queries', type=int, default=500, help="banyaknya query")
+    parser.add_argument('--repeats', type=int, default=3, help="banyaknya pengulangan pengukuran codec dan query")
+    parser.add_argument('--workdir', help="directory untuk collection dan index (default: directory sementara)")
+    parser.add_argument('--keep', action='store_true', help="jangan hapus directory sementara")
+    parser.add_argument('--output', default='benchmark_results.json', help="file hasil (JSON)")
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help="file baseline (JSON)")
+    parser.add_argument('--save-baseline', action='store_true', help="simpan hasil sebagai baseline baru")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="perubahan relatif yang dianggap regresi (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_summary(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline disimpan ke {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['config'] != results['config']:
+            print("Config baseline berbeda, perbandingan dilewati", file=sys.stderr)
+        else:
+            regressions = compare_with_baseline(results, baseline, args.tolerance)
+            for regression in regressions:
+                print("REGRESI " + regression)
+            if regressions:
+                sys.exit(1)
+            print("Tidak ada regresi dibanding baseline")
+    else:
+        print(f"Baseline {args.baseline} belum ada; jalankan dengan --save-baseline untuk membuatnya",
+              file=sys.stderr)
@@ -1,15 +1,21 @@
+import array
 import os
 import pickle
 import contextlib
+import sys
 import heapq
+import json
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from index import InvertedIndexReader, InvertedIndexWriter
-from util import IdMap, QueryParser, sort_diff_list, sort_intersect_list, sort_union_list
-from compression import EliasGammaPostings, StandardPostings, VBEPostings
+from searcher import QueryResultCache, Searcher, parse_query
+from planner import canonical_query
+from util import CachedStemmer, IdMap, load_stop_words
+from compression import RoaringBitmap, VBEPostings
 from mpstemmer import MPStemmer
 import re
-import requests
 import string
 
 """ 
@@ -18,6 +24,22 @@ pip install tqdm
 """
 from tqdm import tqdm
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy opsional; tanpa NumPy, inversion td_pairs memakai sorting pure Python
+    np = None
+
+# Tanpa NumPy, td_pairs diurutkan per chunk sebesar ini lalu di-merge, supaya
+# objek int Python yang dibuat saat sorting tidak sebanyak seluruh td_pairs
+SORT_CHUNK_SIZE = 1 << 20
+
+try:
+    import resource
+except ImportError:
+    # Modul resource tidak tersedia di Windows; peak RSS tidak dilaporkan
+    resource = None
+
 
 class BSBIIndex:
     """
@@ -31,26 +53,114 @@ class BSBIIndex:
     postings_encoding: Lihat di compression.py, kandidatnya adalah StandardPostings,
                     VBEPostings, dsb.
     index_name(str): Nama dari file yang berisi inverted index
+    stem_cache_capacity(int): Kapasitas cache stemming (lihat CachedStemmer)
+    result_cache(QueryResultCache): Cache hasil boolean_retrieve(...), dengan
+                    kapasitas result_cache_size query dan umur entry
+                    result_cache_ttl detik (None berarti tidak kedaluwarsa)
+    memory_budget(int): Jika diberikan, indexing memakai SPIMI: intermediate
+                    index di-flush setiap kali perkiraan ukuran dictionary
+                    di memori mencapai memory_budget bytes, tanpa memedulikan
+                    struktur directory collection (lihat spimi_indexing)
+    flush_stats(List[dict]): Statistik setiap flush SPIMI, termasuk peak RSS
+    merge_factor(int): Banyaknya segment bersebelahan dalam satu tier yang
+                    di-merge menjadi satu segment (lihat merge_segments)
+    compaction_threshold(float): Fraksi dokumen terhapus (tombstone) yang
+                    memicu compact() setelah delete_documents(...)
+    read_ahead(int): Banyaknya dokumen yang dibaca lebih dulu oleh thread
+                    pool selagi dokumen sebelumnya di-parse (0 berarti
+                    dokumen dibaca langsung, tanpa thread)
+    read_workers(int): Banyaknya thread pembaca dokumen
+    stage_times(dict): Total waktu (detik) setiap tahap (STAGES) indexing
+                    terakhir, lihat iter_parsed_documents; write adalah
+                    inversion dan penulisan intermediate index, dan merge
+                    adalah merging ke main index
+
+    Index terdiri dari satu atau lebih segment yang dicatat di manifest
+    (MANIFEST_FILENAME). start_indexing(...) menghasilkan satu segment
+    (index_name), dan add_documents(...)/add_block(...) menambahkan segment
+    baru tanpa membangun ulang index. docID setiap segment tidak overlap dan
+    naik sesuai urutan segment di manifest.
     """
+    # Ukuran buffer untuk membaca intermediate index secara sekuensial saat merging
+    MERGE_BUFFER_SIZE = 1 << 20
+    # Perkiraan memori dictionary SPIMI: overhead per term (objek array dan
+    # entry dict) dan per posting (satu item array('L'))
+    SPIMI_TERM_BYTES = sys.getsizeof(array.array('L')) + 100
+    SPIMI_POSTING_BYTES = array.array('L').itemsize
+    MANIFEST_FILENAME = 'segments.json'
+    TOMBSTONE_FILENAME = 'tombstones.bitmap'
+    STAGES = ('read', 'wait', 'parse', 'write', 'merge')
 
-    def __init__(self, data_path, output_path, postings_encoding, index_name="main_index"):
+    def __init__(self, data_path, output_path, postings_encoding, index_name="main_index",
+                 stem_cache_capacity=200000, result_cache_size=1024, result_cache_ttl=None, memory_budget=None,
+                 merge_factor=10, compaction_threshold=0.2, read_ahead=32, read_workers=4):
         self.term_id_map = IdMap()
         self.doc_id_map = IdMap()
         self.data_path = data_path
         self.output_path = output_path
         self.index_name = index_name
         self.postings_encoding = postings_encoding
+        self.stem_cache_capacity = stem_cache_capacity
+        self._stemmer = None
+        self.result_cache = QueryResultCache(result_cache_size, result_cache_ttl)
+        self.memory_budget = memory_budget
+        self.flush_stats = []
+        self.merge_factor = merge_factor
+        self.compaction_threshold = compaction_threshold
+        self.read_ahead = read_ahead
+        self.read_workers = read_workers
+        self.stage_times = dict.fromkeys(self.STAGES, 0.0)
 
         # Untuk menyimpan nama-nama file dari semua intermediate inverted index
         self.intermediate_indices = []
 
+    @property
+    def stemmer(self):
+        """
+        CachedStemmer di atas MPStemmer yang dipakai bersama oleh indexing dan
+        query. Dibuat sekali, dan jika ada, isi cache dari run sebelumnya
+        dimuat dari output directory.
+        """
+        if self._stemmer is None:
+            self._stemmer = CachedStemmer(MPStemmer(), capacity=self.stem_cache_capacity)
+            if self.output_path is not None:
+                self._stemmer.load(os.path.join(self.output_path, CachedStemmer.FILENAME))
+        return self._stemmer
+
+    def save_stem_cache(self):
+        """Menyimpan isi cache stemming ke output directory agar dipakai di run berikutnya"""
+        self.stemmer.save(os.path.join(self.output_path, CachedStemmer.FILENAME))
+
     def save(self):
-        """Menyimpan doc_id_map and term_id_map ke output directory via pickle"""
+        """
+        Menyimpan doc_id_map and term_id_map ke output directory via pickle.
+        Ditulis ke file sementara lalu di-rename, sama seperti InvertedIndexWriter,
+        supaya Searcher yang sedang open() tidak membaca pickle yang setengah jadi.
+        """
+        for file_name, id_map in (('terms.dict', self.term_id_map), ('docs.dict', self.doc_id_map)):
+            file_path = os.path.join(self.output_path, file_name)
+            with open(file_path + '.tmp', 'wb') as f:
+                pickle.dump(id_map, f)
+            os.replace(file_path + '.tmp', file_path)
 
-        with open(os.path.join(self.output_path, 'terms.dict'), 'wb') as f:
-            pickle.dump(self.term_id_map, f)
-        with open(os.path.join(self.output_path, 'docs.dict'), 'wb') as f:
-            pickle.dump(self.doc_id_map, f)
+    def index_generation(self):
+        """
+        Mengembalikan penanda generation dari index di output directory,
+        yaitu mtime dan ukuran file main index, metadata-nya, terms.dict,
+        docs.dict, manifest segment, dan tombstones. Penanda ini berubah
+        setiap kali index dibangun ulang, segment-nya berubah, atau ada
+        dokumen yang dihapus, dan dipakai untuk
+        meng-invalidate result_cache.
+        """
+        generation = []
+        for file_name in (self.index_name + '.index', self.index_name + '.dict', 'terms.dict', 'docs.dict',
+                          self.MANIFEST_FILENAME, self.TOMBSTONE_FILENAME):
+            try:
+                stat = os.stat(os.path.join(self.output_path, file_name))
+                generation.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                generation.append(None)
+        return tuple(generation)
 
     def load(self):
         """Memuat doc_id_map and term_id_map dari output directory"""
@@ -60,7 +170,7 @@ class BSBIIndex:
         with open(os.path.join(self.output_path, 'docs.dict'), 'rb') as f:
             self.doc_id_map = pickle.load(f)
 
-    def start_indexing(self):
+    def start_indexing(self, n_workers=1):
         """
         Base indexing code
         BAGIAN UTAMA untuk melakukan Indexing dengan skema BSBI (blocked-sort
@@ -69,31 +179,456 @@ class BSBIIndex:
         Method ini scan terhadap semua data di collection, memanggil parse_block
         untuk parsing dokumen dan memanggil invert_write yang melakukan inversion
         di setiap block dan menyimpannya ke index yang baru.
+
+        Parameters
+        ----------
+        n_workers: int
+            Banyaknya worker process untuk parsing dan menulis intermediate
+            index. Jika lebih dari 1, digunakan parallel_indexing(...); hasil
+            index tetap sama persis dengan indexing serial.
+
+        Jika memory_budget diberikan, block tidak lagi ditentukan oleh
+        sub-directory, tetapi oleh memory budget (lihat spimi_indexing).
         """
-        # loop untuk setiap sub-directory di dalam folder collection (setiap block)
-        for block_path in tqdm(sorted(next(os.walk(self.data_path))[1])):
-            td_pairs = self.parsing_block(block_path)
-            index_id = 'intermediate_index_' + block_path
-            self.intermediate_indices.append(index_id)
-            with InvertedIndexWriter(index_id, self.postings_encoding, path=self.output_path) as index:
-                self.write_to_index(td_pairs, index)
-                td_pairs = None
+        if self.memory_budget is not None and n_workers > 1:
+            raise ValueError("memory_budget hanya didukung untuk indexing serial (n_workers=1)")
+        block_paths = sorted(next(os.walk(self.data_path))[1])
+        self.stage_times = dict.fromkeys(self.STAGES, 0.0)
+
+        # Pastikan stopwords bisa dimuat sebelum parsing dimulai
+        self.get_stop_words()
+
+        if self.memory_budget is not None:
+            self.spimi_indexing()
+        elif n_workers > 1:
+            self.parallel_indexing(block_paths, n_workers)
+        else:
+            # loop untuk setiap sub-directory di dalam folder collection (setiap block)
+            for block_path in tqdm(block_paths):
+                td_pairs = self.parsing_block(block_path)
+                index_id = 'intermediate_index_' + block_path
+                self.intermediate_indices.append(index_id)
+                start = time.perf_counter()
+                with InvertedIndexWriter(index_id, self.postings_encoding, path=self.output_path) as index:
+                    self.write_to_index(td_pairs, index)
+                    td_pairs = None
+                self.stage_times['write'] += time.perf_counter() - start
 
         self.save()
+        self.save_stem_cache()
 
+        start = time.perf_counter()
         with InvertedIndexWriter(self.index_name, self.postings_encoding, path=self.output_path) as merged_index:
             with contextlib.ExitStack() as stack:
                 indices = [
-                    stack.enter_context(InvertedIndexReader(index_id, self.postings_encoding, path=self.output_path))
+                    stack.enter_context(InvertedIndexReader(index_id, self.postings_encoding, path=self.output_path,
+                                                            buffer_size=self.MERGE_BUFFER_SIZE))
                     for index_id in self.intermediate_indices]
                 self.merge_index(indices, merged_index)
+        self.stage_times['merge'] += time.perf_counter() - start
+
+        # Index yang baru dibangun menggantikan semua segment sebelumnya. docID
+        # bisa berubah, sehingga tombstones yang lama juga tidak berlaku lagi.
+        self.remove_tombstones()
+        manifest = self.load_manifest()
+        for segment in manifest['segments']:
+            if segment['name'] != self.index_name:
+                self.remove_index_files(segment['name'])
+        manifest['segments'] = [{'name': self.index_name, 'n_docs': len(self.doc_id_map)}]
+        manifest['purged'] = 0
+        self.save_manifest(manifest)
+
+    def load_manifest(self):
+        """
+        Memuat manifest segment dari output directory. Jika belum ada
+        (index lama), manifest berisi satu segment index_name dengan
+        banyaknya dokumen len(self.doc_id_map), jika index tersebut ada.
+
+        Returns
+        -------
+        dict
+            {'generation': int, 'next_segment_id': int, 'purged': int,
+             'segments': [{'name': str, 'n_docs': int}, ...]}
+            purged adalah banyaknya tombstones yang postings-nya sudah
+            dibuang oleh compact().
+        """
+        manifest_path = os.path.join(self.output_path, self.MANIFEST_FILENAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            manifest.setdefault('purged', 0)
+            return manifest
+        segments = []
+        if os.path.exists(os.path.join(self.output_path, self.index_name + '.dict')):
+            segments.append({'name': self.index_name, 'n_docs': len(self.doc_id_map)})
+        return {'generation': 0, 'next_segment_id': 0, 'purged': 0, 'segments': segments}
+
+    def save_manifest(self, manifest):
+        """Menaikkan generation lalu menyimpan manifest secara atomic (tulis ke file sementara lalu rename)."""
+        manifest['generation'] += 1
+        manifest_path = os.path.join(self.output_path, self.MANIFEST_FILENAME)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def segment_names(self):
+        """Nama index setiap segment yang sedang aktif, terurut berdasarkan docID."""
+        return [segment['name'] for segment in self.load_manifest()['segments']]
+
+    def remove_index_files(self, index_name):
+        for extension in ('.index', '.dict'):
+            file_path = os.path.join(self.output_path, index_name + extension)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def add_documents(self, document_paths, merge=True):
+        """
+        Menambahkan dokumen-dokumen ke index yang sudah ada sebagai satu
+        segment baru, tanpa membangun ulang index. term_id_map dan doc_id_map
+        yang tersimpan dimuat lalu diperluas, sehingga termID dan docID lama
+        tidak berubah dan docID dokumen baru lebih besar dari semua docID
+        sebelumnya. Dokumen yang sudah ada di index dilewati. Dokumen yang
+        sudah dihapus dengan delete_documents(...) diindeks ulang dengan docID
+        baru (doc_id_map menunjuk ke docID baru tersebut), sedangkan docID
+        lamanya tetap tercatat di tombstones.
+
+        Parameters
+        ----------
+        document_paths: Iterable[str]
+            Path dokumen-dokumen yang akan ditambahkan
+        merge: bool
+            Jika True, merge_segments() dijalankan setelah segment ditulis
+
+        Returns
+        -------
+        str atau None
+            Nama segment baru, atau None jika tidak ada dokumen baru
+        """
+        if os.path.exists(os.path.join(self.output_path, 'terms.dict')):
+            self.load()
+        manifest = self.load_manifest()
+        self.get_stop_words()
+
+        tombstones = self.load_tombstones()
+        td_pairs = array.array('Q')
+        n_docs = 0
+        new_paths = [document_path for document_path in dict.fromkeys(document_paths)
+                     if document_path not in self.doc_id_map or self.doc_id_map.get(document_path) in tombstones]
+        for document_path, tokens in self.iter_parsed_documents(new_paths):
+            if document_path in self.doc_id_map:
+                doc_id = self.doc_id_map.reassign(document_path)
+            else:
+                doc_id = self.doc_id_map[document_path]
+            n_docs += 1
+            term_ids = self.term_id_map.get_ids(tokens)
+            td_pairs.extend([pack_td_pair(term_id, doc_id) for term_id in term_ids])
+        if n_docs == 0:
+            return None
+
+        segment_name = 'segment_' + str(manifest['next_segment_id'])
+        manifest['next_segment_id'] += 1
+        with InvertedIndexWriter(segment_name, self.postings_encoding, path=self.output_path) as index:
+            self.write_to_index(td_pairs, index)
+        self.save()
+        self.save_stem_cache()
+
+        manifest['segments'].append({'name': segment_name, 'n_docs': n_docs})
+        self.save_manifest(manifest)
+        if merge:
+            self.merge_segments()
+        return segment_name
+
+    def add_block(self, block_path, merge=True):
+        """
+        Menambahkan semua dokumen di sebuah directory (relatif terhadap
+        data_path, seperti block pada parsing_block) sebagai segment baru.
+        Lihat add_documents(...).
+        """
+        directory = os.path.join(self.data_path, block_path)
+        return self.add_documents([os.path.join(directory, filename) for filename in os.listdir(directory)],
+                                  merge=merge)
+
+    def segment_tier(self, n_docs):
+        """Tier sebuah segment: floor(log_merge_factor(n_docs))."""
+        tier = 0
+        while n_docs >= self.merge_factor:
+            n_docs //= self.merge_factor
+            tier += 1
+        return tier
+
+    def find_merge_run(self, segments, force=False):
+        """
+        Mencari merge_factor segment bersebelahan yang berada di tier yang
+        sama (tiered merge policy). Dengan force=True, semua segment dipilih.
+        Mengembalikan (start, end) atau None jika tidak ada yang perlu di-merge.
+        """
+        if force:
+            return (0, len(segments)) if len(segments) > 1 else None
+        run_start = 0
+        for i in range(1, len(segments) + 1):
+            if i == len(segments) or \
+                    self.segment_tier(segments[i]['n_docs']) != self.segment_tier(segments[run_start]['n_docs']):
+                if i - run_start >= self.merge_factor:
+                    return run_start, run_start + self.merge_factor
+                run_start = i
+        return None
+
+    def merge_segments(self, force=False):
+        """
+        Menjalankan tiered merge policy: selama ada merge_factor segment
+        bersebelahan dalam tier yang sama, segment-segment tersebut di-merge
+        dengan merge_index(...) menjadi satu segment (di tier berikutnya).
+        Dengan begitu, banyaknya segment tetap O(merge_factor * log(n_docs)),
+        sedangkan segment baru yang kecil bisa ditambahkan dengan cepat.
+        Dengan force=True, semua segment di-merge menjadi satu.
+
+        Returns
+        -------
+        List[str]
+            Nama segment-segment baru hasil merge
+        """
+        if os.path.exists(os.path.join(self.output_path, 'terms.dict')):
+            self.load()
+        manifest = self.load_manifest()
+        merged_segments = []
+        while True:
+            run = self.find_merge_run(manifest['segments'], force)
+            if run is None:
+                return merged_segments
+            merged_segments.append(self.merge_segment_run(manifest, *run))
+
+    def merge_segment_run(self, manifest, start, end, deleted=None, n_deleted=0):
+        """
+        Me-merge segment manifest['segments'][start:end] menjadi satu segment
+        baru dengan merge_index(...), memperbarui manifest, lalu menghapus
+        file segment-segment lama. docID di deleted (jika ada) dibuang dari
+        segment baru; n_deleted adalah banyaknya dokumen di segment-segment
+        tersebut yang terbuang karenanya. Mengembalikan nama segment baru.
+        """
+        segments = manifest['segments'][start:end]
+        segment_name = 'segment_' + str(manifest['next_segment_id'])
+        manifest['next_segment_id'] += 1
+        with InvertedIndexWriter(segment_name, self.postings_encoding, path=self.output_path) as merged_index:
+            with contextlib.ExitStack() as stack:
+                indices = [
+                    stack.enter_context(InvertedIndexReader(segment['name'], self.postings_encoding,
+                                                            path=self.output_path,
+                                                            buffer_size=self.MERGE_BUFFER_SIZE))
+                    for segment in segments]
+                self.merge_index(indices, merged_index, deleted)
+
+        n_docs = sum(segment['n_docs'] for segment in segments) - n_deleted
+        manifest['segments'][start:end] = [{'name': segment_name, 'n_docs': n_docs}]
+        self.save_manifest(manifest)
+        for segment in segments:
+            self.remove_index_files(segment['name'])
+        return segment_name
+
+    def load_tombstones(self):
+        """
+        Memuat docID dokumen-dokumen yang sudah dihapus (tombstones) dari
+        TOMBSTONE_FILENAME, disimpan sebagai RoaringBitmap. Mengembalikan
+        bitmap kosong jika belum ada dokumen yang dihapus.
+        """
+        tombstone_path = os.path.join(self.output_path, self.TOMBSTONE_FILENAME)
+        if not os.path.exists(tombstone_path):
+            return RoaringBitmap.from_sorted([])
+        with open(tombstone_path, 'rb') as f:
+            return RoaringBitmap.from_bytes(f.read())
+
+    def save_tombstones(self, tombstones):
+        """Menyimpan tombstones secara atomic (tulis ke file sementara lalu rename)."""
+        tombstone_path = os.path.join(self.output_path, self.TOMBSTONE_FILENAME)
+        with open(tombstone_path + '.tmp', 'wb') as f:
+            f.write(tombstones.to_bytes())
+        os.replace(tombstone_path + '.tmp', tombstone_path)
+
+    def remove_tombstones(self):
+        tombstone_path = os.path.join(self.output_path, self.TOMBSTONE_FILENAME)
+        if os.path.exists(tombstone_path):
+            os.remove(tombstone_path)
+
+    def delete_documents(self, document_paths, compact=True):
+        """
+        Menghapus dokumen-dokumen dari index tanpa membangun ulang index.
+        docID dokumen tersebut dicatat di tombstones, dan Searcher membuang
+        docID tersebut dari hasil setiap query. Postings-nya baru benar-benar
+        dibuang saat compact(), yang dijalankan otomatis jika fraksi dokumen
+        terhapus yang belum di-compact melebihi compaction_threshold. Path
+        yang tidak ada di index atau sudah dihapus diabaikan.
+
+        Parameters
+        ----------
+        document_paths: Iterable[str]
+            Path dokumen-dokumen yang akan dihapus (seperti di hasil query)
+        compact: bool
+            Jika False, compact() tidak dijalankan walaupun threshold terlewati
+
+        Returns
+        -------
+        int
+            Banyaknya dokumen yang baru dihapus
+        """
+        self.load()
+        doc_ids = sorted(set(doc_id for doc_id in map(self.doc_id_map.get, document_paths) if doc_id is not None))
+        tombstones = self.load_tombstones()
+        n_deleted = len(tombstones)
+        tombstones = tombstones.union(doc_ids)
+        if len(tombstones) == n_deleted:
+            return 0
+        self.save_tombstones(tombstones)
+
+        manifest = self.load_manifest()
+        n_docs = sum(segment['n_docs'] for segment in manifest['segments'])
+        if compact and len(tombstones) - manifest['purged'] > self.compaction_threshold * n_docs:
+            self.compact()
+        return len(tombstones) - n_deleted
+
+    def compact(self):
+        """
+        Menulis ulang semua segment menjadi satu segment tanpa postings dari
+        dokumen-dokumen yang sudah dihapus. docID dokumen yang tersisa tidak
+        berubah. Tombstones tetap disimpan (supaya path yang sama tidak
+        dihapus dua kali), tetapi manifest mencatat bahwa semuanya sudah
+        di-purge, sehingga Searcher tidak perlu memfilter hasil query lagi.
+        Mengembalikan nama segment baru, atau None jika tidak ada yang perlu
+        di-compact.
+        """
+        self.load()
+        tombstones = self.load_tombstones()
+        manifest = self.load_manifest()
+        n_deleted = len(tombstones) - manifest['purged']
+        if n_deleted == 0 or not manifest['segments']:
+            return None
+        manifest['purged'] = len(tombstones)
+        return self.merge_segment_run(manifest, 0, len(manifest['segments']), tombstones, n_deleted)
+
+    def parallel_indexing(self, block_paths, n_workers):
+        """
+        Parsing dan penulisan intermediate index untuk setiap block yang
+        disebar ke beberapa worker process.
+
+        Setiap worker mem-parsing satu block dengan IdMap lokal (termID dan
+        docID lokal untuk block tersebut). Di process utama, hasil tiap block
+        diproses sesuai urutan block_paths: string term dan dokumen lokal
+        didaftarkan ke self.term_id_map dan self.doc_id_map sesuai urutan id
+        lokalnya, yang sama dengan urutan kemunculannya saat parsing serial.
+        Karena itu, id global yang di-assign sama persis dengan indexing serial.
+        Remapping postings dan penulisan intermediate index kemudian dikerjakan
+        lagi oleh worker.
+
+        Parameters
+        ----------
+        block_paths: List[str]
+            Relative path setiap block, sudah terurut
+        n_workers: int
+            Banyaknya worker process
+        """
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            parse_args = [(self.data_path, self.output_path, block_path, self.stem_cache_capacity)
+                          for block_path in block_paths]
+            write_futures = []
+            parsed_blocks = executor.map(_parse_block_worker, parse_args)
+            for block_path, (local_term_map, local_doc_map, inverted) in \
+                    tqdm(zip(block_paths, parsed_blocks), total=len(block_paths)):
+                # Remap id lokal ke id global, mengikuti urutan id lokal
+                doc_remap = self.doc_id_map.get_ids(local_doc_map[i] for i in range(len(local_doc_map)))
+                term_remap = self.term_id_map.get_ids(local_term_map[i] for i in range(len(local_term_map)))
+
+                index_id = 'intermediate_index_' + block_path
+                self.intermediate_indices.append(index_id)
+                write_futures.append(executor.submit(
+                    _write_block_worker, index_id, self.postings_encoding, self.output_path,
+                    inverted, term_remap, doc_remap))
+
+            for future in write_futures:
+                # Propagate exception dari worker, jika ada
+                future.result()
+
+    def spimi_indexing(self):
+        """
+        Indexing dengan skema SPIMI (single-pass in-memory indexing) dengan
+        memory budget. Semua dokumen di setiap block (sub-directory data_path,
+        lihat iter_document_paths) dibaca satu per satu, dengan urutan yang
+        sama seperti indexing per directory sehingga termID dan docID yang
+        di-assign juga sama. Postings setiap term langsung ditambahkan ke
+        dictionary termID -> array of docIDs; karena docID di-assign menaik,
+        postings selalu terurut tanpa perlu sorting.
+
+        Setiap kali perkiraan ukuran dictionary mencapai memory_budget bytes
+        (dicek di batas dokumen, sehingga satu dokumen tidak pernah terpecah
+        ke dua intermediate index), dictionary di-flush menjadi sebuah
+        intermediate index. Statistik setiap flush, termasuk peak RSS process,
+        disimpan di self.flush_stats.
+        """
+        term_dict = {}
+        estimated_bytes = 0
+        for document_path, tokens in self.iter_parsed_documents(tqdm(list(self.iter_document_paths()))):
+            doc_id = self.doc_id_map[document_path]
+            term_ids = self.term_id_map.get_ids(tokens)
+            # dict.fromkeys: termID unik dengan urutan kemunculan tetap
+            for term_id in dict.fromkeys(term_ids):
+                postings_list = term_dict.get(term_id)
+                if postings_list is None:
+                    postings_list = term_dict[term_id] = array.array('L')
+                    estimated_bytes += self.SPIMI_TERM_BYTES
+                postings_list.append(doc_id)
+                estimated_bytes += self.SPIMI_POSTING_BYTES
+
+            if estimated_bytes >= self.memory_budget:
+                self.flush_block(term_dict, estimated_bytes)
+                term_dict = {}
+                estimated_bytes = 0
+
+        if term_dict:
+            self.flush_block(term_dict, estimated_bytes)
+
+    def iter_document_paths(self):
+        """
+        Menghasilkan path setiap dokumen di block-block collection, yaitu
+        sub-directory data_path yang dikunjungi terurut (seperti block_paths
+        pada start_indexing). File di setiap directory mengikuti urutan
+        os.listdir seperti pada parsing_block, dan sub-directory di dalam
+        block dikunjungi secara rekursif. File yang langsung berada di
+        data_path bukan bagian dari block mana pun, sehingga dilewati
+        (sama seperti indexing per directory).
+        """
+        for block_path in sorted(next(os.walk(self.data_path))[1]):
+            for directory, sub_directories, _ in os.walk(os.path.join(self.data_path, block_path)):
+                sub_directories.sort()
+                for filename in os.listdir(directory):
+                    document_path = os.path.join(directory, filename)
+                    if os.path.isfile(document_path):
+                        yield document_path
+
+    def flush_block(self, term_dict, estimated_bytes):
+        """
+        Menulis dictionary termID -> postings list (hasil SPIMI) sebagai
+        intermediate index berikutnya, lalu mencatat statistiknya.
+        """
+        index_id = 'intermediate_index_spimi_' + str(len(self.intermediate_indices))
+        self.intermediate_indices.append(index_id)
+        start = time.perf_counter()
+        with InvertedIndexWriter(index_id, self.postings_encoding, path=self.output_path) as index:
+            for term_id in sorted(term_dict.keys()):
+                index.append(term_id, term_dict[term_id])
+        self.stage_times['write'] += time.perf_counter() - start
+
+        stats = {'index_id': index_id,
+                 'terms': len(term_dict),
+                 'postings': sum(len(postings_list) for postings_list in term_dict.values()),
+                 'estimated_bytes': estimated_bytes,
+                 'peak_rss_bytes': _peak_rss_bytes()}
+        self.flush_stats.append(stats)
 
     def get_stop_words(self):
-        # Using Satya stopwords
-        # Fetch data from GitHub and split data by newline (\n)
-        URL = 'https://raw.githubusercontent.com/datascienceid/stopwords-bahasa-indonesia/master/stopwords_id_satya.txt'
-        r = requests.get(URL)
-        return r.text.split("\n")
+        """
+        Mengembalikan stopwords (frozenset) dari file lokal, dicari di
+        output_path lalu di directory project. Stopwords tidak pernah
+        diunduh di sini; jika file tidak ada, FileNotFoundError dilempar
+        (lihat util.fetch_stop_words / python search.py --fetch-stop-words).
+        """
+        return load_stop_words(self.output_path)
 
     def parsing_block(self, block_path):
         """
@@ -124,82 +659,209 @@ class BSBIIndex:
 
         Returns
         -------
-        List[Tuple[Int, Int]]
+        array.array
             Returns all the td_pairs extracted from the block
             Mengembalikan semua pasangan <termID, docID> dari sebuah block (dalam hal
-            ini sebuah sub-direktori di dalam folder collection)
+            ini sebuah sub-direktori di dalam folder collection), di-pack sebagai
+            array('Q') berisi termID << 32 | docID (lihat pack_td_pair). Dengan
+            packing ini, satu pasangan hanya memakan 8 byte, bukan satu tuple
+            dan dua objek int.
 
         Harus menggunakan self.term_id_map dan self.doc_id_map untuk mendapatkan
         termIDs dan docIDs. Dua variable ini harus persis untuk semua pemanggilan
         parse_block(...).
         """
-        # Prerequisite resources
-        stemmer = MPStemmer()
-        tokenizer_pattern = r'\w+'
-        satya_stop_words = set(self.get_stop_words())
-        PUNCTUATION = string.punctuation
-
-        td_pairs = []
+        td_pairs = array.array('Q')
 
-        # Loop for every file in every block
-        for filename in os.listdir(os.path.join(self.data_path, block_path)):
-            # Get document path and save it to doc_id_map
-            document_path = os.path.join(self.data_path, block_path, filename)
+        # Loop for every file in every block. Isi file dibaca lebih dulu oleh
+        # thread pool (lihat iter_parsed_documents) selagi dokumen di-parse.
+        document_paths = [os.path.join(self.data_path, block_path, filename)
+                          for filename in os.listdir(os.path.join(self.data_path, block_path))]
+        for document_path, tokens in self.iter_parsed_documents(document_paths):
+            # Save document path to doc_id_map
             doc_id = self.doc_id_map[document_path]
 
-            # Open document by document path
-            with open(document_path, 'r', encoding='utf-8') as file:
-                content = file.read() 
+            # Append (term_id, doc_id) pair for every filtered token, looking up
+            # all term ids of the document at once
+            term_ids = self.term_id_map.get_ids(tokens)
+            td_pairs.extend([pack_td_pair(term_id, doc_id) for term_id in term_ids])
 
-                # Tokenize content
-                tokens_parsed = re.findall(tokenizer_pattern, content)
+        return td_pairs
 
-                # Convert to lowercase and stem token
-                stemmed_tokens = [stemmer.stem(token.lower()) for token in tokens_parsed \
-                                  if token not in PUNCTUATION]
+    def iter_parsed_documents(self, document_paths):
+        """
+        Pipeline producer/consumer untuk parsing dokumen: thread pool
+        (read_workers thread) membaca isi dokumen hingga read_ahead dokumen
+        di depan, selagi thread ini melakukan tokenisasi dan stemming. Hasil
+        tetap dikembalikan sesuai urutan document_paths, sehingga docID yang
+        di-assign pemanggil sama seperti tanpa prefetching.
 
-                # Exclude stopwords from list of tokens
-                filtered_tokens = [token for token in stemmed_tokens if token not in satya_stop_words]
+        Waktu setiap tahap ditambahkan ke self.stage_times:
+        - read: total waktu membaca file di thread pembaca
+        - wait: waktu thread ini menunggu isi dokumen yang belum selesai
+          dibaca. Jika wait mendekati read, indexing I/O-bound; jika wait
+          mendekati 0, indexing CPU-bound.
+        - parse: waktu tokenisasi, stemming, dan penghapusan stopwords
 
-                # Append (term_id, doc_id) pair for every filtered token
-                for token in filtered_tokens:
-                    term_id = self.term_id_map[token]
-                    td_pairs.append((term_id, doc_id))
+        Yields
+        ------
+        (str, List[str])
+            Path dokumen dan token-tokennya (lihat parse_content)
+        """
+        stage_times = self.stage_times
+        # Stopwords cukup dicari sekali untuk semua dokumen
+        stop_words = self.get_stop_words()
+        if self.read_ahead <= 0:
+            for document_path in document_paths:
+                content, read_seconds = _timed_read(document_path)
+                stage_times['read'] += read_seconds
+                stage_times['wait'] += read_seconds
+                start = time.perf_counter()
+                tokens = self.parse_content(content, stop_words)
+                stage_times['parse'] += time.perf_counter() - start
+                yield document_path, tokens
+            return
 
-        return td_pairs
+        with ThreadPoolExecutor(max_workers=self.read_workers) as executor:
+            remaining_paths = iter(document_paths)
+            # Antrian (bounded) berisi dokumen yang sedang/sudah dibaca, sesuai urutan
+            pending = deque()
+            for document_path in remaining_paths:
+                pending.append((document_path, executor.submit(_timed_read, document_path)))
+                if len(pending) >= self.read_ahead:
+                    break
+            while pending:
+                document_path, future = pending.popleft()
+                start = time.perf_counter()
+                content, read_seconds = future.result()
+                stage_times['wait'] += time.perf_counter() - start
+                stage_times['read'] += read_seconds
+
+                next_path = next(remaining_paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(_timed_read, next_path)))
+
+                start = time.perf_counter()
+                tokens = self.parse_content(content, stop_words)
+                stage_times['parse'] += time.perf_counter() - start
+                yield document_path, tokens
+
+    def parse_document(self, document_path, stop_words=None):
+        """
+        Tokenisasi, stemming, dan penghapusan stopwords untuk satu dokumen.
+        stop_words (hasil get_stop_words()) sebaiknya diberikan jika banyak
+        dokumen di-parse, supaya stopwords tidak dicari ulang per dokumen.
+
+        Returns
+        -------
+        List[str]
+            Token-token dokumen yang sudah di-stem dan bukan stopwords, sesuai
+            urutan kemunculannya
+        """
+        # Open document by document path
+        with open(document_path, 'r', encoding='utf-8') as file:
+            return self.parse_content(file.read(), stop_words)
+
+    def parse_content(self, content, stop_words=None):
+        """Seperti parse_document(...), tetapi untuk isi dokumen yang sudah dibaca."""
+        # Prerequisite resources
+        stemmer = self.stemmer
+        tokenizer_pattern = r'\w+'
+        satya_stop_words = self.get_stop_words() if stop_words is None else stop_words
+        PUNCTUATION = string.punctuation
+
+        # Tokenize content
+        tokens_parsed = re.findall(tokenizer_pattern, content)
+
+        # Convert to lowercase and stem token
+        stemmed_tokens = [stemmer.stem(token) for token in tokens_parsed \
+                          if token not in PUNCTUATION]
+
+        # Exclude stopwords from list of tokens
+        return [token for token in stemmed_tokens if token not in satya_stop_words]
 
     def write_to_index(self, td_pairs, index):
         """
-        Melakukan inversion td_pairs (list of <termID, docID> pairs) dan
-        menyimpan mereka ke index. Disini diterapkan konsep BSBI dimana 
-        hanya di-mantain satu dictionary besar untuk keseluruhan block.
-        Namun dalam teknik penyimpanannya digunakan srategi dari SPIMI
-        yaitu penggunaan struktur data hashtable (dalam Python bisa
-        berupa Dictionary)
+        Melakukan inversion td_pairs (packed <termID, docID> pairs, lihat
+        parsing_block) dan menyimpan mereka ke index. Inversion dilakukan
+        dengan sorting (lihat invert_td_pairs), sehingga postings setiap term
+        berupa slice yang bersebelahan dari satu array docIDs, dan slice
+        tersebut yang diberikan ke index.append(...).
 
-        ASUMSI: td_pairs CUKUP di memori
+        ASUMSI: td_pairs CUKUP di memori (jika tidak, gunakan memory_budget,
+        lihat spimi_indexing)
 
         Parameters
         ----------
-        td_pairs: List[Tuple[Int, Int]]
-            List of termID-docID pairs
+        td_pairs: array.array
+            Packed termID-docID pairs (array('Q'))
         index: InvertedIndexWriter
             Inverted index pada disk (file) yang terkait dengan suatu "block"
         """
-        term_dict = {}
-        for term_id, doc_id in td_pairs:
-            if term_id not in term_dict:
-                term_dict[term_id] = set()
-            term_dict[term_id].add(doc_id)
-        for term_id in sorted(term_dict.keys()):
-            index.append(term_id, sorted(list(term_dict[term_id])))
+        term_ids, offsets, doc_ids = self.invert_td_pairs(td_pairs)
+        for i, term_id in enumerate(term_ids):
+            index.append(term_id, doc_ids[offsets[i]:offsets[i + 1]])
+
+    @staticmethod
+    def invert_td_pairs(td_pairs):
+        """
+        Melakukan inversion td_pairs dengan satu kali sort + unique terhadap
+        pasangan (termID, docID) yang sudah di-pack menjadi satu bilangan
+        64-bit: setelah diurutkan, pasangan dengan termID yang sama menjadi
+        bersebelahan dan docID-nya sudah terurut serta unik. Jika NumPy
+        tersedia, sort/unique dan pemisahan per term dikerjakan secara
+        vectorized (np.unique). Tanpa NumPy, td_pairs diurutkan per chunk
+        SORT_CHUNK_SIZE menjadi array('Q'), lalu chunk-chunk tersebut
+        di-merge dan duplikatnya dibuang sambil di-scan.
+
+        Parameters
+        ----------
+        td_pairs: array.array
+            Packed termID-docID pairs (array('Q'), lihat pack_td_pair)
+
+        Returns
+        -------
+        Tuple[array.array, array.array, array.array]
+            (term_ids, offsets, doc_ids): term_ids terurut menaik, dan postings
+            list term_ids[i] adalah doc_ids[offsets[i]:offsets[i + 1]]
+        """
+        if np is not None:
+            keys = np.unique(np.frombuffer(td_pairs, dtype=np.uint64))
+            terms = keys >> np.uint64(32)
+            starts = np.flatnonzero(terms[1:] != terms[:-1]) + 1
+            starts = np.concatenate(([0], starts)) if len(keys) else starts
+            offsets = np.append(starts, len(keys))
+            return (_numpy_to_array(terms[starts]), _numpy_to_array(offsets),
+                    _numpy_to_array(keys & np.uint64(0xFFFFFFFF)))
 
-    def merge_index(self, indices, merged_index):
+        chunks = [array.array('Q', sorted(td_pairs[start:start + SORT_CHUNK_SIZE]))
+                  for start in range(0, len(td_pairs), SORT_CHUNK_SIZE)]
+        term_ids, offsets, doc_ids = array.array('L'), array.array('L'), array.array('L')
+        last_key = last_term_id = None
+        for key in heapq.merge(*chunks):
+            if key == last_key:
+                continue
+            last_key = key
+            term_id = key >> 32
+            if term_id != last_term_id:
+                term_ids.append(term_id)
+                offsets.append(len(doc_ids))
+                last_term_id = term_id
+            doc_ids.append(key & 0xFFFFFFFF)
+        offsets.append(len(doc_ids))
+        return term_ids, offsets, doc_ids
+
+    def merge_index(self, indices, merged_index, deleted=None):
         """
         Lakukan merging ke semua intermediate inverted indices menjadi
         sebuah single index.
 
-        Ini adalah bagian yang melakukan EXTERNAL MERGE SORT
+        Ini adalah bagian yang melakukan EXTERNAL MERGE SORT. Setiap
+        intermediate index dibaca secara sekuensial dari depan ke belakang
+        melalui iterator-nya (terms di setiap index terurut menaik). Sebuah
+        heap yang di-key dengan termID dipakai untuk mengambil term terkecil
+        berikutnya, sehingga untuk setiap term hanya index yang benar-benar
+        memuat term tersebut yang di-merge.
 
         Parameters
         ----------
@@ -211,18 +873,46 @@ class BSBIIndex:
         merged_index: InvertedIndexWriter
             Instance InvertedIndexWriter object yang merupakan hasil merging dari
             semua intermediate InvertedIndexWriter objects.
+
+        deleted: RoaringBitmap
+            docID yang dibuang dari hasil merge (lihat compact). Term yang
+            postings list-nya menjadi kosong tidak ditulis.
         """
-        # Loop for every term
-        for i in range(len(self.term_id_map)):
+        # Untuk encoding hybrid, threshold df postings yang disimpan sebagai
+        # bitmap dipilih dari banyaknya dokumen di collection
+        for_collection = getattr(merged_index.encoding_method, 'for_collection', None)
+        if for_collection is not None:
+            merged_index.encoding_method = for_collection(len(self.doc_id_map))
+
+        # Isi heap: (term_id, nomor index, postings_list). Pasangan term_id dan
+        # nomor index selalu unik, sehingga postings_list tidak pernah dibandingkan.
+        heap = []
+        for i, index in enumerate(indices):
+            entry = next(index, None)
+            if entry is not None:
+                heap.append((entry[0], i, entry[1]))
+        heapq.heapify(heap)
+
+        while heap:
+            term_id = heap[0][0]
             list_of_postings_list = []
-            for index in indices:
-                # Find the postings list for every term in every intermediate index
-                list_of_postings_list.append(index.get_postings_list(i))
+            # Ambil postings list term ini dari semua index yang memuatnya,
+            # lalu majukan iterator index-index tersebut
+            while heap and heap[0][0] == term_id:
+                _, i, postings_list = heapq.heappop(heap)
+                list_of_postings_list.append(postings_list)
+                entry = next(indices[i], None)
+                if entry is not None:
+                    heapq.heappush(heap, (entry[0], i, entry[1]))
             # Merge using heap and append to merged_index
-            sorted_list = list(heapq.merge(*list_of_postings_list))
-            merged_index.append(i, sorted_list)
+            postings_list = list(heapq.merge(*list_of_postings_list))
+            if deleted is not None:
+                postings_list = [doc_id for doc_id in postings_list if doc_id not in deleted]
+                if not postings_list:
+                    continue
+            merged_index.append(term_id, postings_list)
 
-    def boolean_retrieve(self, query):
+    def boolean_retrieve(self, query, limit=None, offset=0):
         """
         Melakukan boolean retrieval untuk mengambil semua dokumen yang
         mengandung semua kata pada query. Lakukan pre-processing seperti
@@ -243,6 +933,10 @@ class BSBIIndex:
             himpunan AND, NOT, dan DIFF, serta tanda kurung untuk presedensi. 
 
             contoh: (universitas AND indonesia OR depok) DIFF ilmu AND komputer
+        limit: int atau None
+            Banyaknya dokumen maksimum yang dikembalikan; None berarti semua
+        offset: int
+            Banyaknya dokumen pertama yang dilewati
 
         Returns
         ------
@@ -251,46 +945,108 @@ class BSBIIndex:
             Harus mengembalikan EMPTY LIST [] jika tidak ada yang match.
 
         JANGAN LEMPAR ERROR/EXCEPTION untuk terms yang TIDAK ADA di collection.
-        """
-        # Load metadata
-        self.load()
 
-        stemmer = MPStemmer()
-        satya_stop_words = set(self.get_stop_words())
+        Hasil query disimpan di result_cache, sehingga query yang sama (atau
+        ekuivalen, misalnya urutan operand AND/OR berbeda) tidak perlu
+        membuka dan mengevaluasi index lagi selama index tidak berubah.
 
-        qp = QueryParser(query, stemmer, satya_stop_words)
-        if not qp.is_valid():
-            print("Query tidak valid karena mengandung stopwords.")
+        Jika limit atau offset diberikan, hanya dokumen ke-offset hingga
+        ke-(offset + limit - 1) yang dikembalikan, dan query dievaluasi
+        secara lazy sehingga pembacaan postings berhenti begitu halaman
+        tersebut terpenuhi (lihat Searcher.retrieve_page).
+        """
+        postfix = parse_query(query, self.stemmer, self.get_stop_words())
+        if postfix is None:
             return []
-        
-        # evaluasi postfix expression
-        tokens = qp.infix_to_postfix()
-        operand_stack = []
-
-        with InvertedIndexReader(self.index_name, self.postings_encoding, self.output_path) as index:
-            for token in tokens:
-                if token in ('AND', 'DIFF', 'OR'):
-                    right = operand_stack.pop()
-                    left = operand_stack.pop()
-                    if token == 'AND':
-                        result = sort_intersect_list(left, right)
-                    elif token == 'DIFF':
-                        result = sort_diff_list(left, right)
-                    else:
-                        result = sort_union_list(left, right)
-                    operand_stack.append(result)
-                else:
-                    term_id = self.term_id_map[token]
-                    postings_list = index.get_postings_list(term_id)
-                    operand_stack.append(postings_list)
-
-        docs = operand_stack[0] if operand_stack else []
-
-        result = []
-        for doc_id in docs:
-            result.append(self.doc_id_map[doc_id])
-
-        return result
+        result = self.result_cache.get(canonical_query(postfix), self.index_generation())
+        if result is not None:
+            return result[offset:None if limit is None else offset + limit]
+
+        with Searcher(self) as searcher:
+            if limit is None and offset == 0:
+                return searcher.retrieve_postfix(postfix, lookup_cache=False)
+            return searcher.retrieve_page(postfix, limit, offset, lookup_cache=False)
+
+    def retrieve_many(self, queries):
+        """
+        Boolean retrieval untuk banyak query sekaligus dengan index yang
+        dibuka sekali; lihat Searcher.retrieve_many(...).
+        """
+        with Searcher(self) as searcher:
+            return searcher.retrieve_many(queries)
+
+
+
+def _timed_read(document_path):
+    """Membaca isi sebuah dokumen; mengembalikan (isi, lama pembacaan dalam detik)."""
+    start = time.perf_counter()
+    with open(document_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+    return content, time.perf_counter() - start
+
+
+def pack_td_pair(term_id, doc_id):
+    """
+    Mem-pack pasangan <termID, docID> menjadi satu bilangan 64-bit, sehingga
+    urutan bilangan tersebut sama dengan urutan (termID, docID).
+    ASUMSI: termID dan docID muat di 4 byte unsigned.
+    """
+    return term_id << 32 | doc_id
+
+
+def _numpy_to_array(values):
+    """Mengubah NumPy array of unsigned integers menjadi array.array('L') tanpa membuat objek int per elemen."""
+    result = array.array('L')
+    result.frombytes(values.astype(f'<u{result.itemsize}' if sys.byteorder == 'little'
+                                   else f'>u{result.itemsize}').tobytes())
+    return result
+
+
+def _peak_rss_bytes():
+    """Peak resident set size process ini dalam bytes, atau None jika tidak tersedia."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam kilobytes di Linux, tetapi dalam bytes di macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# BSBIIndex milik worker process, lihat _parse_block_worker(...)
+_worker_index = None
+
+
+def _parse_block_worker(args):
+    """
+    Dijalankan di worker process: parsing satu block dengan IdMap lokal.
+    Mengembalikan term_id_map lokal, doc_id_map lokal, dan postings hasil
+    inversion (dengan termID dan docID lokal).
+    """
+    global _worker_index
+    data_path, output_path, block_path, stem_cache_capacity = args
+    # Satu BSBIIndex dipakai ulang untuk semua block di process ini, supaya
+    # cache stemming dan stopwords tidak dibangun ulang di setiap block
+    if _worker_index is None:
+        _worker_index = BSBIIndex(data_path=data_path, output_path=output_path, postings_encoding=None,
+                                  stem_cache_capacity=stem_cache_capacity)
+    local_index = _worker_index
+    local_index.term_id_map = IdMap()
+    local_index.doc_id_map = IdMap()
+    td_pairs = local_index.parsing_block(block_path)
+    return local_index.term_id_map, local_index.doc_id_map, BSBIIndex.invert_td_pairs(td_pairs)
+
+
+def _write_block_worker(index_id, postings_encoding, output_path, inverted, term_remap, doc_remap):
+    """
+    Dijalankan di worker process: remap postings satu block (hasil
+    BSBIIndex.invert_td_pairs) dari id lokal ke id global, lalu tulis sebagai
+    intermediate index. docID global di dalam satu block di-assign
+    berurutan, sehingga postings list hasil remap tetap terurut.
+    """
+    term_ids, offsets, doc_ids = inverted
+    with InvertedIndexWriter(index_id, postings_encoding, path=output_path) as index:
+        for i in sorted(range(len(term_ids)), key=lambda i: term_remap[term_ids[i]]):
+            index.append(term_remap[term_ids[i]],
+                         array.array('L', [doc_remap[doc_id] for doc_id in doc_ids[offsets[i]:offsets[i + 1]]]))
 
 
 if __name__ == "__main__":
@@ -302,6 +1058,12 @@ if __name__ == "__main__":
     BSBI_instance.start_indexing()  # memulai indexing!
     end = time.time()
     print(f"Elapsed indexing time (BSBI): {end - start}")
+    print(f"Stemming cache: {BSBI_instance.stemmer.stats()}")
+    for stats in BSBI_instance.flush_stats:
+        print(f"flush {stats['index_id']}: {stats['terms']} terms, {stats['postings']} postings, "
+              f"~{stats['estimated_bytes']} bytes, peak RSS {stats['peak_rss_bytes']} bytes")
+    print("Stage times: " + ", ".join(f"{stage} {seconds:.2f}s"
+                                      for stage, seconds in BSBI_instance.stage_times.items()))
     
 
     # BSBI_instance_EG = BSBIIndex(data_path='collections', \
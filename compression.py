@@ -1,4 +1,14 @@
 import array
+import bisect
+import re
+import sys
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy opsional; tanpa NumPy, VBEPostings memakai implementasi pure Python
+    np = None
 
 class StandardPostings:
     """ 
@@ -41,7 +51,8 @@ class StandardPostings:
         ----------
         encoded_postings_list: bytes
             bytearray merepresentasikan encoded postings list sebagai keluaran
-            dari static method encode di atas.
+            dari static method encode di atas. Boleh juga berupa memoryview
+            (misalnya slice dari index yang di-mmap); tidak disalin ke bytes.
 
         Returns
         -------
@@ -70,7 +81,13 @@ class VBEPostings:
 
     ASUMSI: postings_list untuk sebuah term MUAT di memori!
 
+    Jika NumPy tersedia, postings list yang panjangnya minimal
+    NUMPY_MIN_LENGTH di-encode dan di-decode secara vectorized (format
+    bytes-nya sama persis). Untuk postings list pendek, atau tanpa NumPy,
+    dipakai implementasi pure Python.
+
     """
+    NUMPY_MIN_LENGTH = 32
 
     @staticmethod
     def encode(postings_list):
@@ -89,6 +106,9 @@ class VBEPostings:
         bytes
             bytearray yang merepresentasikan urutan integer di postings_list
         """
+        if np is not None and len(postings_list) >= VBEPostings.NUMPY_MIN_LENGTH:
+            return VBEPostings.encode_numpy(postings_list)
+
         # Intialize an empty gap-based list and initial doc_id.
         gap_based_list = []
         prev_doc_id = 0
@@ -106,6 +126,32 @@ class VBEPostings:
         # Encode gap-based list with VB Encoding.
         return VBEPostings.vb_encode(gap_based_list)
 
+    @staticmethod
+    def encode_numpy(postings_list):
+        """
+        Versi vectorized dari encode(...) dengan NumPy, menghasilkan bytes
+        yang sama persis. Banyaknya byte setiap gap dihitung sekaligus, lalu
+        setiap "digit" 7-bit ditulis ke posisinya untuk semua gap sekaligus
+        (paling banyak 10 iterasi untuk bilangan 64-bit).
+        """
+        doc_ids = np.asarray(postings_list, dtype=np.uint64)
+        gaps = np.diff(doc_ids, prepend=np.uint64(0))
+
+        # Banyaknya byte untuk setiap gap = max(1, ceil(bit_length / 7))
+        n_bytes = np.ones(len(gaps), dtype=np.int64)
+        for k in range(1, 10):
+            n_bytes += gaps >= np.uint64(1 << (7 * k))
+        ends = np.cumsum(n_bytes)
+
+        result = np.zeros(int(ends[-1]), dtype=np.uint8)
+        # Byte ke-k dari belakang setiap gap berisi bit ke-7k sampai ke-(7k + 6)
+        for k in range(int(n_bytes.max())):
+            mask = n_bytes > k
+            result[ends[mask] - 1 - k] = (gaps[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        # Tandai byte terakhir setiap gap (tambah 128)
+        result[ends - 1] |= 0x80
+        return result.tobytes()
+
     @staticmethod
     def vb_encode(list_of_numbers):
         """ 
@@ -149,26 +195,67 @@ class VBEPostings:
         ----------
         encoded_postings_list: bytes
             bytearray merepresentasikan encoded postings list sebagai keluaran
-            dari static method encode di atas.
+            dari static method encode di atas. Boleh juga berupa memoryview
+            (misalnya slice dari index yang di-mmap); tidak disalin ke bytes.
 
         Returns
         -------
-        List[int]
-            list of docIDs yang merupakan hasil decoding dari encoded_postings_list
+        array.array
+            array of docIDs (typecode 'L') yang merupakan hasil decoding dari
+            encoded_postings_list
         """
-        # Decode to gap-based list
+        if np is not None and len(encoded_postings_list) >= VBEPostings.NUMPY_MIN_LENGTH:
+            return VBEPostings.decode_numpy(encoded_postings_list)
+
+        # Decode to gap-based list, lalu prefix sum untuk mendapatkan docID asli
         gap_based_list = VBEPostings.vb_decode(encoded_postings_list)
-        result_list = []
-        # Looping to convert to regular list (non gap-based list)
-        for i in range(0, len(gap_based_list)):
-            if i == 0:
-                # Immediately append the first element to regular list
-                result_list.append(gap_based_list[i])
+        return array.array('L', accumulate(gap_based_list))
+
+    @staticmethod
+    def decode_numpy(encoded_postings_list):
+        """
+        Versi vectorized dari decode(...) dengan NumPy. Setiap byte diberi
+        bobot 128^k sesuai posisinya dari byte terakhir gap-nya, lalu byte
+        untuk gap yang sama dijumlahkan dengan np.add.reduceat. docID asli
+        didapat dengan prefix sum (np.cumsum) terhadap gap-based list.
+        """
+        encoded = np.frombuffer(encoded_postings_list, dtype=np.uint8)
+        is_last = encoded >= 128
+        ends = np.flatnonzero(is_last)
+        if len(ends) == 0:
+            return array.array('L')
+        encoded = encoded[:ends[-1] + 1]
+        is_last = is_last[:ends[-1] + 1]
+
+        # Nomor gap untuk setiap byte = banyaknya byte terakhir sebelum byte tersebut
+        gap_index = np.cumsum(is_last) - is_last
+        exponent = (ends[gap_index] - np.arange(len(encoded))).astype(np.uint64)
+        weighted = (encoded & 0x7F).astype(np.uint64) << (np.uint64(7) * exponent)
+
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        gaps = np.add.reduceat(weighted, starts)
+
+        result = array.array('L')
+        result.frombytes(np.cumsum(gaps).astype(result.typecode).tobytes())
+        return result
+
+    @staticmethod
+    def iter_decode(encoded_postings_list):
+        """
+        Versi lazy dari decode(...): generator yang men-decode dan
+        menghasilkan docID satu per satu, sehingga pemanggil yang hanya
+        membutuhkan beberapa docID pertama tidak perlu men-decode seluruh
+        postings list.
+        """
+        doc_id = 0
+        n = 0
+        for byte in encoded_postings_list:
+            if byte < 128:
+                n = 128 * n + byte
             else:
-                # Append the regular list with the content of previous element in regular
-                # list + content of current gap based list
-                result_list.append(result_list[i - 1] + gap_based_list[i])
-        return result_list
+                doc_id += 128 * n + byte - 128
+                n = 0
+                yield doc_id
 
     @staticmethod
     def vb_decode(encoded_bytestream):
@@ -189,110 +276,755 @@ class VBEPostings:
 
 
 class EliasGammaPostings:
-    @staticmethod
-    def eg_encode_number(number):
-        """
-        Encode a number with Elias-Gamma encoding, return encoded string.
-        """
-        if number == 0:
-            return '0'
-        
-        # Convert to binary, exclude heading '0b'
-        binary = str(bin(number))[2:]
-        # log_2(binary) = len(binary) - 1 (with no heading 0)
-        N = len(binary) - 1
-        # Unary coding
-        head = '0'*N + '1'
-        # Ref: https://stackoverflow.com/questions/16926130/convert-to-binary-and-keep-leading-zeros
-        tail = format(number - 2**N, '#0{}b'.format(N + 2))[2:]
-        
-        return head + tail
-    
+    """
+    Encoding postings list dengan Elias-Gamma code yang dikerjakan langsung
+    pada level bit (integer bit buffer, shift, dan mask), tanpa representasi
+    string '0'/'1' dan tanpa konversi ke satu integer besar.
+
+    Yang di-encode adalah gap-based list (seperti VBEPostings), dengan docID
+    pertama ditambah 1, karena Elias-Gamma hanya bisa meng-encode bilangan
+    >= 1. Contoh: [0, 3, 4] ---> [1, 3, 1].
+
+    Elias-Gamma code untuk x >= 1 adalah N = floor(log2(x)) buah bit '0'
+    diikuti representasi binary x (N + 1 bit, diawali '1'). Artinya, code
+    tersebut tidak lain adalah nilai x yang ditulis dalam 2N + 1 bit.
+
+    Format bytes (versi 2):
+        byte pertama 0x00 sebagai penanda versi, lalu semua code disambung
+        (MSB first) dan di-padding dengan bit '0' hingga kelipatan 8 bit.
+
+    Format lama (string-based, tanpa gap) tidak pernah diawali byte 0x00,
+    sehingga masih bisa di-decode; lihat convert_index.py untuk mengubah
+    index lama ke format baru.
+    """
+    VERSION_MARKER = 0
+
     @staticmethod
     def encode(postings_list):
         """
-        Encode postings_list menggunakan Elias-Gamma encoding tanpa menggunakan
+        Encode postings_list menggunakan Elias-Gamma encoding terhadap
         gap-based list.
 
         Parameters
         ----------
         postings_list: List[int]
-            List of docIDs (postings)
+            List of docIDs (postings), terurut menaik dan unik
 
         Returns
         -------
         bytes
             bytearray merepresentasikan hasil encoding Elias-Gamma
         """
-        # Menambahkan result dengan 1 di awal supaya menjadi flag
-        # Jika tidak, jumlah leading zeros di depan yang seharusnya penting akan
-        # terhapus saat melakukan decoding
-        result = '1'
-        for num in postings_list:
-            result += EliasGammaPostings.eg_encode_number(num)
-        # Pendekatan yang saya gunakan untuk ini adalah dengan menyimpan representasi
-        # desimal result dalam bentuk bytes.
-        # Sebelumnya, saya menggunakan bitarray, tapi space yang digunakan untuk menyimpan
-        # encoding (dalam bytes) tidak efisien (sekitar 97-100 bytes untuk list pada bagian test). 
-        # Dengan menggunakan pendekatan ini, space yang digunakan menjadi lebih sedikit 
-        # (sekitar 13 bytes) dibanding menggunakan bitarray.
-        result_int = int(result, 2)
-        # Ref: https://blog.gitnux.com/code/python-bytes/
-        result_bytes = result_int.to_bytes((result_int.bit_length() + 7) // 8, "big")
-        return result_bytes
+        result = bytearray([EliasGammaPostings.VERSION_MARKER])
+        # Bit buffer: acc menyimpan n_bits bit terakhir yang belum ditulis ke result
+        acc = 0
+        n_bits = 0
+        prev_doc_id = -1
+        for doc_id in postings_list:
+            gap = doc_id - prev_doc_id
+            if gap <= 0:
+                raise ValueError("postings list harus terurut menaik dan unik")
+            prev_doc_id = doc_id
+
+            # Code Elias-Gamma untuk gap = gap itu sendiri, ditulis dalam 2N + 1 bit
+            code_length = 2 * gap.bit_length() - 1
+            acc = (acc << code_length) | gap
+            n_bits += code_length
+            if n_bits >= 8:
+                # Tulis semua byte yang sudah penuh, sisakan bit yang belum genap 8
+                n_bytes = n_bits >> 3
+                n_bits &= 7
+                result += (acc >> n_bits).to_bytes(n_bytes, 'big')
+                acc &= (1 << n_bits) - 1
+
+        if n_bits:
+            # Padding dengan bit '0' di akhir
+            result.append(acc << (8 - n_bits))
+        return bytes(result)
 
     @staticmethod
     def decode(encoded_postings_list):
         """
         Decode encoded_postings_list menggunakan Elias-Gamma decoding.
+        Setiap byte hanya dibaca sekali, sehingga waktunya linear terhadap
+        panjang encoded_postings_list.
 
         Parameters
         ----------
         encoded_postings_list: bytes
-            bytearray merepresentasikan hasil encoding Elias-Gamma.
+            bytearray merepresentasikan hasil encoding Elias-Gamma. Boleh juga
+            berupa memoryview (misalnya slice dari index yang di-mmap).
 
         Returns
         -------
         List[int]
             List of docIDs yang merupakan hasil decoding encoded_postings_list.
         """
+        data = encoded_postings_list
+        if len(data) == 0:
+            return []
+        if data[0] != EliasGammaPostings.VERSION_MARKER:
+            return EliasGammaPostings.decode_legacy(data)
+
+        decoded_numbers = []
+        position = 1
+        length = len(data)
+        # Bit buffer: n_bits bit yang sudah dibaca tapi belum dipakai ada di acc
+        acc = 0
+        n_bits = 0
+        # Banyaknya bit '0' (bagian unary) yang sudah dilewati untuk code saat ini
+        zeros = 0
+        doc_id = -1
+        while True:
+            # Lewati bagian unary: selama semua bit di buffer adalah '0', buang
+            # bit tersebut dan baca byte berikutnya
+            while acc == 0:
+                if position >= length:
+                    # Sisa bit '0' adalah padding
+                    return decoded_numbers
+                zeros += n_bits
+                acc = data[position]
+                n_bits = 8
+                position += 1
+
+            # Banyaknya bit '0' di depan bit '1' pertama pada buffer
+            leading_zeros = n_bits - acc.bit_length()
+            N = zeros + leading_zeros
+
+            # Pastikan buffer memuat N + 1 bit mulai dari bit '1' tersebut
+            available = n_bits - leading_zeros
+            if available < N + 1:
+                n_bytes = (N + 1 - available + 7) >> 3
+                if position + n_bytes > length:
+                    raise ValueError("encoded postings list terpotong")
+                acc = (acc << (8 * n_bytes)) | int.from_bytes(data[position:position + n_bytes], 'big')
+                n_bits += 8 * n_bytes
+                available += 8 * n_bytes
+                position += n_bytes
+
+            # Ambil N + 1 bit tersebut sebagai gap, sisanya tetap di buffer
+            rest = available - (N + 1)
+            doc_id += acc >> rest
+            decoded_numbers.append(doc_id)
+            acc &= (1 << rest) - 1
+            n_bits = rest
+            zeros = 0
+
+    @staticmethod
+    def decode_legacy(encoded_postings_list):
+        """
+        Decode postings list yang di-encode dengan format Elias-Gamma lama
+        (representasi string, tanpa gap, diawali bit flag '1'). Hanya dipakai
+        untuk membaca index lama.
+
+        Pada format lama, docID 0 di-encode sebagai '0' yang ambigu dengan
+        bagian unary code berikutnya. Karena postings terurut, docID 0 hanya
+        mungkin muncul di awal; jika hasil decoding biasa tidak valid, bit
+        '0' pertama dianggap sebagai docID 0. Decoding ini best-effort: untuk
+        postings yang diawali docID 0 dan 1, format lama memang ambigu.
+        """
         # Ref: https://blog.gitnux.com/code/python-bytes-to-int/
         bytes_int = int.from_bytes(encoded_postings_list, "big")
         # Potong '0b1' di awal representasi binary
         encoded_postings = bin(bytes_int)[3:]
-        decoded_numbers = []
-        N = 0
-        while len(encoded_postings) != 0:
-            if encoded_postings[0] == '1':
-                # Ambil binary string setelah 1 sebanyak jumlah 0
-                binary_after_one = encoded_postings[1:N+1]
-                # Memastikan binary_after_one bukan string kosong
-                if not binary_after_one:
-                    break
-                # Konversi ke integer
-                K = int(str(binary_after_one), 2)
-                # Hitung menggunakan X = 2^N + K
-                decoded_numbers.append(2 ** N + K)
-                # Memotong bit string hingga dimulai dari elemen ke-N+1
-                encoded_postings = encoded_postings[N+1:]
-                # Reset counter 0
-                N = 0
+
+        def parse(start):
+            decoded_numbers = []
+            position = start
+            length = len(encoded_postings)
+            while position < length:
+                # Hitung jumlah 0 (bagian unary)
+                one_position = encoded_postings.find('1', position)
+                if one_position < 0:
+                    return None
+                N = one_position - position
+                if N == 0:
+                    # Format lama meng-encode 1 sebagai '10'
+                    decoded_numbers.append(1)
+                    position = one_position + 2
+                    continue
+                end = one_position + N + 1
+                if end > length:
+                    return None
+                # X = 2^N + K, dengan K adalah N bit setelah 1
+                decoded_numbers.append(int(encoded_postings[one_position:end], 2))
+                position = end
+            return decoded_numbers
+
+        def is_valid(numbers):
+            return numbers is not None and all(numbers[i] < numbers[i + 1] for i in range(len(numbers) - 1))
+
+        decoded_numbers = parse(0)
+        if not is_valid(decoded_numbers) and encoded_postings.startswith('0'):
+            rest = parse(1)
+            if is_valid(rest):
+                return [0] + rest
+        return decoded_numbers if decoded_numbers is not None else []
+
+
+class SkipVBEPostings:
+    """
+    Variasi dari VBEPostings yang menyimpan skip pointers, supaya postings
+    list yang panjang bisa di-"loncati" tanpa harus di-decode seluruhnya.
+
+    Postings list dibagi menjadi block berisi SKIP_INTERVAL docIDs, dan
+    setiap block di-encode sendiri dengan VBEPostings.encode(...). Untuk
+    setiap block disimpan skip entry berupa (docID pertama di block, posisi
+    byte block tersebut). Dengan skip entries ini, untuk mencari sebuah docID
+    cukup dilakukan binary search pada skip entries, lalu decode satu block
+    saja (lihat SkipPostingsView dan util.skip_intersect_list).
+
+    Format bytes:
+        VB(banyaknya postings n) | VB(SKIP_INTERVAL) |
+        [jika n > SKIP_INTERVAL: docID pertama tiap block (uint32 LE) |
+                                 offset tiap block relatif terhadap awal payload (uint32 LE)] |
+        payload: hasil VBEPostings.encode(...) dari setiap block, berurutan
+
+    Postings list yang pendek (satu block) tidak memiliki skip entries,
+    sehingga overhead-nya hanya beberapa byte header.
+
+    ASUMSI: docID pertama setiap block muat di 4 byte unsigned.
+    """
+    SKIP_INTERVAL = 128
+
+    @staticmethod
+    def encode(postings_list):
+        """
+        Encode postings_list menjadi stream of bytes beserta skip entries.
+
+        Parameters
+        ----------
+        postings_list: List[int]
+            List of docIDs (postings)
+
+        Returns
+        -------
+        bytes
+            bytearray yang merepresentasikan postings_list (lihat format di atas)
+        """
+        n = len(postings_list)
+        interval = SkipVBEPostings.SKIP_INTERVAL
+        header = VBEPostings.vb_encode([n, interval])
+        if n <= interval:
+            return header + VBEPostings.encode(postings_list)
+
+        block_firsts = array.array('I')
+        block_offsets = array.array('I')
+        blocks = []
+        offset = 0
+        for start in range(0, n, interval):
+            block = VBEPostings.encode(postings_list[start:start + interval])
+            block_firsts.append(postings_list[start])
+            block_offsets.append(offset)
+            blocks.append(block)
+            offset += len(block)
+        if sys.byteorder == 'big':
+            block_firsts.byteswap()
+            block_offsets.byteswap()
+        return header + block_firsts.tobytes() + block_offsets.tobytes() + b''.join(blocks)
+
+    @staticmethod
+    def decode(encoded_postings_list):
+        """
+        Decode seluruh postings list (semua block).
+
+        Parameters
+        ----------
+        encoded_postings_list: bytes
+            keluaran dari encode(...) di atas; boleh juga berupa memoryview
+
+        Returns
+        -------
+        array.array
+            array of docIDs (typecode 'L')
+        """
+        return SkipVBEPostings.view(encoded_postings_list).to_array()
+
+    @staticmethod
+    def view(encoded_postings_list):
+        """
+        Mengembalikan SkipPostingsView: representasi lazy dari postings list
+        yang hanya men-decode block yang benar-benar dibutuhkan.
+        """
+        return SkipPostingsView(encoded_postings_list)
+
+
+class SkipPostingsView:
+    """
+    Representasi lazy dari postings list hasil SkipVBEPostings.encode(...).
+    Panjang postings dan skip entries dibaca dari header, sedangkan isi
+    block hanya di-decode ketika diminta lewat block(i).
+
+    Attributes
+    ----------
+    block_firsts: array.array atau None
+        docID pertama setiap block; None jika postings hanya satu block
+    """
+    def __init__(self, encoded_postings_list):
+        data = memoryview(encoded_postings_list)
+        if len(data) == 0:
+            self.length, interval, position = 0, SkipVBEPostings.SKIP_INTERVAL, 0
+        else:
+            self.length, position = _read_vb_number(data, 0)
+            interval, position = _read_vb_number(data, position)
+
+        if self.length <= interval:
+            self.block_firsts = None
+            self.block_offsets = array.array('I', [0])
+        else:
+            n_blocks = (self.length + interval - 1) // interval
+            self.block_firsts = array.array('I')
+            self.block_firsts.frombytes(data[position:position + 4 * n_blocks])
+            position += 4 * n_blocks
+            self.block_offsets = array.array('I')
+            self.block_offsets.frombytes(data[position:position + 4 * n_blocks])
+            position += 4 * n_blocks
+            if sys.byteorder == 'big':
+                self.block_firsts.byteswap()
+                self.block_offsets.byteswap()
+        self.payload = data[position:]
+        self._cached_block = (-1, None)
+
+    def __len__(self):
+        return self.length
+
+    def n_blocks(self):
+        return len(self.block_offsets)
+
+    def block(self, i):
+        """Men-decode block ke-i (block terakhir yang di-decode disimpan sementara)."""
+        cached_i, cached_block = self._cached_block
+        if cached_i == i:
+            return cached_block
+        start = self.block_offsets[i]
+        end = self.block_offsets[i + 1] if i + 1 < len(self.block_offsets) else len(self.payload)
+        block = VBEPostings.decode(self.payload[start:end])
+        self._cached_block = (i, block)
+        return block
+
+    def __iter__(self):
+        for i in range(self.n_blocks()):
+            yield from self.block(i)
+
+    def to_array(self):
+        """Men-decode seluruh block menjadi satu array of docIDs."""
+        result = array.array('L')
+        for i in range(self.n_blocks()):
+            result.extend(self.block(i))
+        return result
+
+
+class HybridPostings:
+    """
+    Postings encoding hybrid: postings list dari term dengan df di bawah
+    BITMAP_THRESHOLD di-encode dengan VBEPostings, sedangkan term dengan df
+    yang besar disimpan sebagai compressed bitmap bergaya roaring (lihat
+    RoaringBitmap). Operasi himpunan terhadap bitmap dikerjakan per word
+    (lihat planner.py), bukan per docID.
+
+    BITMAP_THRESHOLD = None berarti semua postings di-encode dengan VBE
+    (dipakai untuk intermediate index). Untuk main index, threshold dipilih
+    otomatis dari banyaknya dokumen lewat for_collection(...).
+
+    Format bytes:
+        0 | VBEPostings.encode(postings_list)
+        1 | VB(banyaknya container) | untuk setiap container:
+            VB(key) | VB(cardinality) | isi container (lihat RoaringBitmap.to_bytes)
+    """
+    BITMAP_THRESHOLD = None
+    # df minimum agar sebuah postings list disimpan sebagai bitmap
+    MIN_BITMAP_DF = 16
+    # Threshold = n_docs // BITMAP_DENSITY, yaitu df ketika rata-rata setiap
+    # container roaring mulai cukup padat untuk disimpan sebagai bitmap
+    # (ARRAY_MAX / CONTAINER_SIZE = 1/16)
+    BITMAP_DENSITY = 16
+
+    @classmethod
+    def for_collection(cls, n_docs):
+        """
+        Mengembalikan varian HybridPostings dengan BITMAP_THRESHOLD yang
+        dipilih berdasarkan banyaknya dokumen di collection. Hasil encode
+        varian ini tetap bisa di-decode oleh HybridPostings.decode(...).
+        """
+        threshold = max(cls.MIN_BITMAP_DF, n_docs // cls.BITMAP_DENSITY)
+        return type(cls.__name__, (cls,), {'BITMAP_THRESHOLD': threshold})
+
+    @classmethod
+    def encode(cls, postings_list):
+        """
+        Encode postings_list sebagai VBE atau compressed bitmap, tergantung df-nya.
+
+        Parameters
+        ----------
+        postings_list: List[int]
+            List of docIDs (postings)
+
+        Returns
+        -------
+        bytes
+            bytearray yang merepresentasikan postings_list (lihat format di atas)
+        """
+        if cls.BITMAP_THRESHOLD is not None and len(postings_list) >= cls.BITMAP_THRESHOLD:
+            return b'\x01' + RoaringBitmap.from_sorted(postings_list).to_bytes()
+        return b'\x00' + VBEPostings.encode(postings_list)
+
+    @staticmethod
+    def decode(encoded_postings_list):
+        """
+        Decode postings list.
+
+        Parameters
+        ----------
+        encoded_postings_list: bytes
+            keluaran dari encode(...) di atas; boleh juga berupa memoryview
+
+        Returns
+        -------
+        array.array atau RoaringBitmap
+            array of docIDs (typecode 'L') untuk postings yang di-encode
+            dengan VBE, atau RoaringBitmap untuk postings yang disimpan
+            sebagai bitmap (iterable dan punya len(), lihat to_array())
+        """
+        data = memoryview(encoded_postings_list)
+        if len(data) == 0:
+            return array.array('L')
+        if data[0] == 0:
+            return VBEPostings.decode(data[1:])
+        return RoaringBitmap.from_bytes(data[1:])
+
+    @staticmethod
+    def iter_decode(encoded_postings_list):
+        """Versi lazy dari decode(...): generator docID terurut, lihat VBEPostings.iter_decode."""
+        data = memoryview(encoded_postings_list)
+        if len(data) == 0:
+            return
+        if data[0] == 0:
+            yield from VBEPostings.iter_decode(data[1:])
+        else:
+            yield from RoaringBitmap.from_bytes(data[1:])
+
+
+# Posisi bit yang bernilai 1 untuk setiap nilai byte (0..255)
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+_NONZERO_BYTES = re.compile(rb'[^\x00]+')
+
+
+class RoaringBitmap:
+    """
+    Compressed bitmap bergaya roaring untuk himpunan docIDs. Rentang docID
+    dibagi menjadi chunk berukuran CONTAINER_SIZE (2^16); docID di setiap
+    chunk disimpan dalam sebuah container dengan key = docID >> 16:
+        - array container: array('H') terurut berisi 16 bit bawah docID,
+          jika cardinality-nya paling banyak ARRAY_MAX
+        - bitmap container: bytes berukuran BITMAP_BYTES (bit ke-i, little
+          endian, bernilai 1 jika docID key * 2^16 + i ada di himpunan)
+
+    Operasi antara dua bitmap container dilakukan per word dengan mengubah
+    keduanya menjadi int Python (AND/OR/AND NOT dikerjakan di C), sedangkan
+    operasi antara array container dan bitmap container dilakukan dengan
+    mengecek bit untuk setiap elemen array.
+
+    Objek ini tidak pernah diubah setelah dibuat (operasi himpunan selalu
+    menghasilkan objek baru), sehingga aman dipakai bersama, misalnya di cache.
+
+    Attributes
+    ----------
+    keys: List[int]
+        key setiap container, terurut menaik
+    containers: List[array.array atau bytes]
+    length: int
+        banyaknya docIDs (cardinality)
+    """
+    CONTAINER_BITS = 16
+    CONTAINER_SIZE = 1 << 16
+    ARRAY_MAX = 4096
+    BITMAP_BYTES = CONTAINER_SIZE // 8
+
+    def __init__(self, keys, containers):
+        self.keys = keys
+        self.containers = containers
+        self.length = sum(RoaringBitmap.cardinality(container) for container in containers)
+
+    @staticmethod
+    def cardinality(container):
+        if isinstance(container, array.array):
+            return len(container)
+        return int.from_bytes(container, 'little').bit_count()
+
+    @staticmethod
+    def bits_to_container(bits):
+        """Mengubah int (bitset satu chunk) menjadi container yang sesuai, atau None jika kosong."""
+        count = bits.bit_count()
+        if count == 0:
+            return None
+        data = bits.to_bytes(RoaringBitmap.BITMAP_BYTES, 'little')
+        if count > RoaringBitmap.ARRAY_MAX:
+            return data
+        return RoaringBitmap.bitmap_to_array(data)
+
+    @staticmethod
+    def bitmap_to_array(data):
+        """Mengembalikan array('H') berisi posisi bit yang bernilai 1 pada bitmap container."""
+        result = array.array('H')
+        for run in _NONZERO_BYTES.finditer(data):
+            for position in range(run.start(), run.end()):
+                base = position << 3
+                result.extend([base + bit for bit in _BYTE_BITS[data[position]]])
+        return result
+
+    @staticmethod
+    def array_to_bits(container):
+        """Mengubah array container menjadi int (bitset satu chunk)."""
+        data = bytearray(RoaringBitmap.BITMAP_BYTES)
+        for low in container:
+            data[low >> 3] |= 1 << (low & 7)
+        return int.from_bytes(data, 'little')
+
+    @staticmethod
+    def to_bits(container):
+        if isinstance(container, array.array):
+            return RoaringBitmap.array_to_bits(container)
+        return int.from_bytes(container, 'little')
+
+    @staticmethod
+    def container_contains(container, low):
+        if isinstance(container, array.array):
+            i = bisect.bisect_left(container, low)
+            return i < len(container) and container[i] == low
+        return container[low >> 3] >> (low & 7) & 1 == 1
+
+    @classmethod
+    def from_sorted(cls, postings_list):
+        """Membangun RoaringBitmap dari list of docIDs yang terurut menaik."""
+        keys, containers = [], []
+        start, n = 0, len(postings_list)
+        while start < n:
+            key = postings_list[start] >> cls.CONTAINER_BITS
+            end = bisect.bisect_left(postings_list, (key + 1) << cls.CONTAINER_BITS, start)
+            base = key << cls.CONTAINER_BITS
+            container = array.array('H', [doc_id - base for doc_id in postings_list[start:end]])
+            if len(container) > cls.ARRAY_MAX:
+                container = cls.array_to_bits(container).to_bytes(cls.BITMAP_BYTES, 'little')
+            keys.append(key)
+            containers.append(container)
+            start = end
+        return cls(keys, containers)
+
+    def to_bytes(self):
+        """
+        Serialisasi: VB(banyaknya container), lalu untuk setiap container
+        VB(key) | VB(cardinality) | isi container. Isi array container adalah
+        cardinality x uint16 LE, dan isi bitmap container adalah BITMAP_BYTES
+        bytes; jenisnya ditentukan dari cardinality (> ARRAY_MAX berarti bitmap).
+        """
+        parts = [VBEPostings.vb_encode_number(len(self.keys))]
+        for key, container in zip(self.keys, self.containers):
+            parts.append(VBEPostings.vb_encode([key, RoaringBitmap.cardinality(container)]))
+            if isinstance(container, array.array):
+                if sys.byteorder == 'big':
+                    container = array.array('H', container)
+                    container.byteswap()
+                parts.append(container.tobytes())
             else:
-                # Hitung jumlah 0 sambil menghilangkan angka 0 tersebut 
-                N += 1
-                encoded_postings = encoded_postings[1:]
-              
-        return decoded_numbers
+                parts.append(container)
+        return b''.join(bytes(part) for part in parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Kebalikan dari to_bytes(); data boleh berupa memoryview."""
+        data = memoryview(data)
+        n_containers, position = _read_vb_number(data, 0)
+        keys, containers = [], []
+        for _ in range(n_containers):
+            key, position = _read_vb_number(data, position)
+            count, position = _read_vb_number(data, position)
+            if count > cls.ARRAY_MAX:
+                container = bytes(data[position:position + cls.BITMAP_BYTES])
+                position += cls.BITMAP_BYTES
+            else:
+                container = array.array('H')
+                container.frombytes(data[position:position + 2 * count])
+                if sys.byteorder == 'big':
+                    container.byteswap()
+                position += 2 * count
+            keys.append(key)
+            containers.append(container)
+        return cls(keys, containers)
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def nbytes(self):
+        """Perkiraan ukuran isi bitmap di memori (dalam bytes)."""
+        return sum(len(container) * (container.itemsize if isinstance(container, array.array) else 1)
+                   for container in self.containers) + 8 * len(self.keys)
+
+    def __contains__(self, doc_id):
+        key = doc_id >> self.CONTAINER_BITS
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return False
+        return RoaringBitmap.container_contains(self.containers[i], doc_id & (self.CONTAINER_SIZE - 1))
+
+    def __iter__(self):
+        for key, container in zip(self.keys, self.containers):
+            base = key << self.CONTAINER_BITS
+            if not isinstance(container, array.array):
+                container = RoaringBitmap.bitmap_to_array(container)
+            for low in container:
+                yield base + low
+
+    def to_array(self):
+        """Mengembalikan seluruh docIDs sebagai array (typecode 'L') terurut."""
+        return array.array('L', self)
+
+    def intersection(self, other):
+        """
+        Intersection dengan RoaringBitmap lain (hasilnya RoaringBitmap), atau
+        dengan list of docIDs terurut (hasilnya array('L'), dengan mengecek
+        setiap docID di list terhadap bitmap ini).
+        """
+        if not isinstance(other, RoaringBitmap):
+            return array.array('L', [doc_id for doc_id in other if doc_id in self])
+
+        keys, containers = [], []
+        i = j = 0
+        while i < len(self.keys) and j < len(other.keys):
+            if self.keys[i] < other.keys[j]:
+                i += 1
+            elif self.keys[i] > other.keys[j]:
+                j += 1
+            else:
+                container_A, container_B = self.containers[i], other.containers[j]
+                if isinstance(container_B, array.array) and not isinstance(container_A, array.array):
+                    container_A, container_B = container_B, container_A
+                if isinstance(container_A, array.array):
+                    # Array container: cek setiap elemennya di container lain
+                    container = array.array('H', [low for low in container_A
+                                                  if RoaringBitmap.container_contains(container_B, low)])
+                    container = container if container else None
+                else:
+                    container = RoaringBitmap.bits_to_container(
+                        int.from_bytes(container_A, 'little') & int.from_bytes(container_B, 'little'))
+                if container is not None:
+                    keys.append(self.keys[i])
+                    containers.append(container)
+                i += 1
+                j += 1
+        return RoaringBitmap(keys, containers)
+
+    def union(self, other):
+        """Union dengan RoaringBitmap lain atau list of docIDs terurut; hasilnya RoaringBitmap."""
+        if not isinstance(other, RoaringBitmap):
+            other = RoaringBitmap.from_sorted(other)
+
+        keys, containers = [], []
+        i = j = 0
+        while i < len(self.keys) or j < len(other.keys):
+            if j == len(other.keys) or (i < len(self.keys) and self.keys[i] < other.keys[j]):
+                keys.append(self.keys[i])
+                containers.append(self.containers[i])
+                i += 1
+            elif i == len(self.keys) or self.keys[i] > other.keys[j]:
+                keys.append(other.keys[j])
+                containers.append(other.containers[j])
+                j += 1
+            else:
+                keys.append(self.keys[i])
+                containers.append(RoaringBitmap.bits_to_container(
+                    RoaringBitmap.to_bits(self.containers[i]) | RoaringBitmap.to_bits(other.containers[j])))
+                i += 1
+                j += 1
+        return RoaringBitmap(keys, containers)
+
+    def difference(self, other):
+        """Difference (self - other) dengan RoaringBitmap lain atau list of docIDs terurut; hasilnya RoaringBitmap."""
+        if not isinstance(other, RoaringBitmap):
+            other = RoaringBitmap.from_sorted(other)
+
+        keys, containers = [], []
+        j = 0
+        for key, container in zip(self.keys, self.containers):
+            while j < len(other.keys) and other.keys[j] < key:
+                j += 1
+            if j < len(other.keys) and other.keys[j] == key:
+                other_container = other.containers[j]
+                if isinstance(container, array.array):
+                    container = array.array('H', [low for low in container
+                                                  if not RoaringBitmap.container_contains(other_container, low)])
+                    container = container if container else None
+                else:
+                    container = RoaringBitmap.bits_to_container(
+                        int.from_bytes(container, 'little') & ~RoaringBitmap.to_bits(other_container))
+            if container is not None:
+                keys.append(key)
+                containers.append(container)
+        return RoaringBitmap(keys, containers)
+
+
+def _read_vb_number(data, position):
+    """Membaca satu bilangan Variable-Byte dari data mulai posisi position."""
+    n = 0
+    while True:
+        byte = data[position]
+        position += 1
+        if byte < 128:
+            n = 128 * n + byte
+        else:
+            return 128 * n + byte - 128, position
 
 
 if __name__ == '__main__':
     postings_list = [34, 67, 89, 454, 2345738]
-    for Postings in [StandardPostings, VBEPostings, EliasGammaPostings]:
+    for Postings in [StandardPostings, VBEPostings, EliasGammaPostings, SkipVBEPostings,
+                     HybridPostings, HybridPostings.for_collection(0)]:
         print(Postings.__name__)
         encoded_postings_list = Postings.encode(postings_list)
         print("byte hasil encode: ", encoded_postings_list)
         print("ukuran encoded postings: ", len(encoded_postings_list), "bytes")
         decoded_posting_list = Postings.decode(encoded_postings_list)
         print("hasil decoding: ", decoded_posting_list)
-        assert decoded_posting_list == postings_list, "hasil decoding tidak sama dengan postings original"
+        assert list(decoded_posting_list) == postings_list, "hasil decoding tidak sama dengan postings original"
+        assert list(Postings.decode(memoryview(encoded_postings_list))) == postings_list, \
+            "decoding dari memoryview salah"
         print()
+
+    # Elias-Gamma: list kosong, docID 0, postings list panjang, dan format lama
+    for postings_list in [[], [0], [0, 1, 2, 3], list(range(0, 600000, 3)), [5, 2 ** 40]]:
+        assert EliasGammaPostings.decode(EliasGammaPostings.encode(postings_list)) == postings_list, \
+            "Elias-Gamma salah"
+    assert EliasGammaPostings.decode(b'\x01\x04@C') == [34, 67], "decoding format lama salah"
+
+    # VBE: implementasi vectorized (jika ada NumPy) harus sama dengan pure Python
+    postings_list = list(range(0, 3000000, 7)) + [2 ** 40, 2 ** 40 + 1]
+    encoded_postings_list = VBEPostings.encode(postings_list)
+    gaps = [postings_list[0]] + [b - a for a, b in zip(postings_list, postings_list[1:])]
+    assert encoded_postings_list == VBEPostings.vb_encode(gaps), "VBE encoding salah"
+    assert list(VBEPostings.decode(encoded_postings_list)) == postings_list, "VBE decoding salah"
+    assert list(VBEPostings.decode(b'')) == [], "VBE decoding salah"
+    assert list(VBEPostings.iter_decode(encoded_postings_list)) == postings_list, "VBE lazy decoding salah"
+
+    # Skip pointers: hanya block yang dibutuhkan yang di-decode
+    view = SkipVBEPostings.view(SkipVBEPostings.encode(postings_list))
+    assert len(view) == len(postings_list) and list(view) == postings_list, "SkipVBEPostings salah"
+    assert list(view.block(3)) == postings_list[3 * 128:4 * 128], "block SkipVBEPostings salah"
+    assert list(SkipVBEPostings.decode(SkipVBEPostings.encode([]))) == [], "SkipVBEPostings salah"
+
+    # Compressed bitmap: array container dan bitmap container, serta operasi himpunannya
+    sparse_list = list(range(5, 200000, 37))
+    dense_list = list(range(0, 70000, 3)) + [131072, 140000]
+    for postings_list in [sparse_list, dense_list]:
+        encoded_postings_list = HybridPostings.for_collection(0).encode(postings_list)
+        bitmap = HybridPostings.decode(encoded_postings_list)
+        assert isinstance(bitmap, RoaringBitmap) and list(bitmap) == postings_list, "RoaringBitmap salah"
+        assert len(bitmap) == len(postings_list), "RoaringBitmap salah"
+        assert list(HybridPostings.iter_decode(encoded_postings_list)) == postings_list, "lazy decoding salah"
+    sparse, dense = RoaringBitmap.from_sorted(sparse_list), RoaringBitmap.from_sorted(dense_list)
+    assert not isinstance(dense.containers[0], array.array), "container padat harus berupa bitmap"
+    assert list(sparse.intersection(dense)) == sorted(set(sparse_list) & set(dense_list)), "intersection salah"
+    assert list(dense.intersection(dense)) == dense_list, "intersection salah"
+    assert list(sparse.union(dense)) == sorted(set(sparse_list) | set(dense_list)), "union salah"
+    assert list(dense.difference(sparse)) == sorted(set(dense_list) - set(sparse_list)), "difference salah"
+    assert list(sparse.difference(dense_list)) == sorted(set(sparse_list) - set(dense_list)), "difference salah"
+    assert list(dense.intersection([3, 4, 131072])) == [3, 131072], "intersection dengan list salah"
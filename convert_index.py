@@ -0,0 +1,97 @@
+"""
+Script untuk mengkonversi index yang sudah ada ke format terbaru.
+
+1. File metadata index (*.dict) yang masih berupa pickle [postings_dict,
+   terms] diubah ke format binary TermDictionary (lihat index.py).
+   terms.dict dan docs.dict (IdMap) tidak diubah.
+2. Dengan opsi --elias-gamma, postings pada index Elias-Gamma format lama
+   di-encode ulang ke format Elias-Gamma versi 2 (lihat compression.py).
+
+Penggunaan:
+    python convert_index.py index index_eg
+    python convert_index.py --elias-gamma index_eg
+"""
+import os
+import pickle
+import sys
+
+from compression import EliasGammaPostings
+from index import InvertedIndexReader, InvertedIndexWriter, TermDictionary
+
+
+def convert_metadata(file_path):
+    """
+    Mengkonversi satu file metadata index ke format TermDictionary.
+    Mengembalikan True jika file dikonversi, False jika file sudah dalam
+    format baru atau bukan metadata index.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if data.startswith(TermDictionary.MAGIC):
+        return False
+
+    metadata = pickle.loads(data)
+    if not (isinstance(metadata, list) and len(metadata) == 2 and isinstance(metadata[0], dict)):
+        return False
+
+    postings_dict, terms = metadata
+    TermDictionary.from_postings_dict(postings_dict, terms).save(file_path)
+    return True
+
+
+def convert_directory(path):
+    """Mengkonversi semua file metadata index di sebuah directory index."""
+    for filename in sorted(os.listdir(path)):
+        if not filename.endswith('.dict'):
+            continue
+        file_path = os.path.join(path, filename)
+        if convert_metadata(file_path):
+            print(f"{file_path}: dikonversi")
+        else:
+            print(f"{file_path}: dilewati")
+
+
+def convert_elias_gamma_index(index_name, path):
+    """
+    Meng-encode ulang satu index Elias-Gamma format lama ke format versi 2.
+    Index baru ditulis dengan nama sementara lalu di-rename menggantikan
+    index lama. Mengembalikan False jika index sudah dalam format baru.
+    """
+    with InvertedIndexReader(index_name, EliasGammaPostings, path=path) as index:
+        first_byte = index.index_file.read(1)
+        if first_byte and first_byte[0] == EliasGammaPostings.VERSION_MARKER:
+            return False
+        index.index_file.seek(0)
+
+        tmp_name = index_name + '_converting'
+        with InvertedIndexWriter(tmp_name, EliasGammaPostings, path=path) as converted_index:
+            for term_id, postings_list in index:
+                converted_index.append(term_id, postings_list)
+
+    os.replace(os.path.join(path, tmp_name + '.index'), os.path.join(path, index_name + '.index'))
+    os.replace(os.path.join(path, tmp_name + '.dict'), os.path.join(path, index_name + '.dict'))
+    return True
+
+
+def convert_elias_gamma_directory(path):
+    """Meng-encode ulang semua index Elias-Gamma (pasangan .index dan .dict) di sebuah directory."""
+    for filename in sorted(os.listdir(path)):
+        if not filename.endswith('.index'):
+            continue
+        index_name = filename[:-len('.index')]
+        if not os.path.isfile(os.path.join(path, index_name + '.dict')):
+            continue
+        if convert_elias_gamma_index(index_name, path):
+            print(f"{os.path.join(path, filename)}: di-encode ulang")
+        else:
+            print(f"{os.path.join(path, filename)}: dilewati")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args and args[0] == '--elias-gamma':
+        for path in args[1:] or ['index_eg']:
+            convert_elias_gamma_directory(path)
+    else:
+        for path in args or ['index', 'index_eg']:
+            convert_directory(path)
@@ -1,5 +1,301 @@
+import array
+import bisect
+import contextlib
+import heapq
+import itertools
+import mmap
 import pickle
 import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+
+class TermDictionary(Mapping):
+    """
+    Representasi postings_dict yang compact: empat array paralel dengan
+    lebar tetap (term ID, offset di index file, df, dan panjang postings
+    dalam bytes), menggantikan python's Dictionary berisi tuple. Dari luar,
+    objek ini tetap berperilaku seperti postings_dict biasa:
+
+        postings_dict[term_id] ---> (start_position_in_index_file,
+                                     number_of_postings_in_list,
+                                     length_in_bytes_of_postings_list)
+
+    Lookup dilakukan dengan indexing langsung jika term ID yang disimpan
+    adalah 0, 1, 2, ... (misalnya main index), atau binary search jika
+    term ID terurut menaik (misalnya intermediate index).
+
+    Format file (little-endian):
+        MAGIC (8 bytes) | banyaknya term n (uint64) |
+        term_ids (n x uint32) | offsets (n x uint64) | dfs (n x uint32) | lengths (n x uint32)
+    """
+    MAGIC = b'IRDICT\x00\x01'
+    HEADER = struct.Struct('<8sQ')
+    TYPECODES = ('I', 'Q', 'I', 'I')
+
+    def __init__(self):
+        self.term_ids = array.array('I')
+        self.offsets = array.array('Q')
+        self.dfs = array.array('I')
+        self.lengths = array.array('I')
+        self._dense = True
+        self._sorted = True
+        self._positions = None
+
+    def _arrays(self):
+        return (self.term_ids, self.offsets, self.dfs, self.lengths)
+
+    def _update_flags(self):
+        """Menghitung ulang apakah term_ids dense (0..n-1) dan/atau terurut."""
+        term_ids = self.term_ids
+        self._dense = term_ids == array.array('I', range(len(term_ids)))
+        self._sorted = self._dense or all(term_ids[i] < term_ids[i + 1] for i in range(len(term_ids) - 1))
+        self._positions = None
+
+    def _find(self, term_id):
+        """Mengembalikan posisi term_id di array, atau -1 jika tidak ada."""
+        term_ids = self.term_ids
+        if self._dense:
+            return term_id if 0 <= term_id < len(term_ids) else -1
+        if self._sorted:
+            i = bisect.bisect_left(term_ids, term_id)
+            return i if i < len(term_ids) and term_ids[i] == term_id else -1
+        if self._positions is None:
+            self._positions = {t: i for i, t in enumerate(term_ids)}
+        return self._positions.get(term_id, -1)
+
+    def __getitem__(self, term_id):
+        if not isinstance(term_id, int):
+            raise KeyError(term_id)
+        i = self._find(term_id)
+        if i < 0:
+            raise KeyError(term_id)
+        return (self.offsets[i], self.dfs[i], self.lengths[i])
+
+    def __contains__(self, term_id):
+        return isinstance(term_id, int) and self._find(term_id) >= 0
+
+    def __setitem__(self, term_id, value):
+        """
+        Menambahkan term baru di akhir (urutan penambahan = urutan terms),
+        atau mengganti nilai term yang sudah ada.
+        """
+        offset, df, length = value
+        i = self._find(term_id)
+        if i >= 0:
+            self.offsets[i], self.dfs[i], self.lengths[i] = offset, df, length
+            return
+
+        term_ids = self.term_ids
+        if term_ids and term_id < term_ids[-1]:
+            self._sorted = False
+        if term_id != len(term_ids):
+            self._dense = False
+        if self._positions is not None:
+            self._positions[term_id] = len(term_ids)
+        term_ids.append(term_id)
+        self.offsets.append(offset)
+        self.dfs.append(df)
+        self.lengths.append(length)
+
+    def __iter__(self):
+        return iter(self.term_ids)
+
+    def __len__(self):
+        return len(self.term_ids)
+
+    def to_bytes(self):
+        """Serialisasi ke format binary (lihat docstring class)."""
+        chunks = [self.HEADER.pack(self.MAGIC, len(self.term_ids))]
+        for arr in self._arrays():
+            if sys.byteorder == 'big':
+                arr = array.array(arr.typecode, arr)
+                arr.byteswap()
+            chunks.append(arr.tobytes())
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Membangun TermDictionary dari hasil to_bytes() (bytes atau memoryview)."""
+        data = memoryview(data)
+        magic, n = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("bukan file TermDictionary")
+        term_dict = cls()
+        position = cls.HEADER.size
+        for arr in term_dict._arrays():
+            size = n * arr.itemsize
+            arr.frombytes(data[position:position + size])
+            if sys.byteorder == 'big':
+                arr.byteswap()
+            position += size
+        term_dict._update_flags()
+        return term_dict
+
+    @classmethod
+    def from_postings_dict(cls, postings_dict, terms):
+        """Membangun TermDictionary dari postings_dict dan terms format lama (pickle)."""
+        term_dict = cls()
+        for term_id in terms:
+            term_dict[term_id] = postings_dict[term_id]
+        return term_dict
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Memuat metadata index dari file_path dengan satu kali read. File
+        metadata format lama (pickle [postings_dict, terms]) juga didukung.
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if data.startswith(cls.MAGIC):
+            return cls.from_bytes(data)
+        postings_dict, terms = pickle.loads(data)
+        return cls.from_postings_dict(postings_dict, terms)
+
+    def save(self, file_path):
+        """Menyimpan ke file_path secara atomic (tulis ke file sementara lalu rename)."""
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, file_path)
+
+
+class PostingsCache:
+    """
+    Cache untuk postings list yang sudah di-decode, supaya postings dari
+    term yang populer tidak perlu dibaca dan di-decode ulang di setiap query.
+    Postings disimpan sebagai array (compact), dan total ukurannya dibatasi
+    oleh max_bytes. Jika penuh, entry di-evict dengan kebijakan LRU (least
+    recently used) atau LFU (least frequently used). Semua operasi dilindungi
+    lock sehingga aman dipakai dari beberapa thread.
+
+    Postings yang dikembalikan oleh cache dipakai bersama; JANGAN dimodifikasi.
+
+    Attributes
+    ----------
+    max_bytes: int
+        Batas total ukuran postings di cache (dalam bytes)
+    policy: str
+        'lru' atau 'lfu'
+    """
+    # Perkiraan overhead satu entry (objek array, key, dan struktur cache)
+    ENTRY_OVERHEAD = 128
+
+    def __init__(self, max_bytes, policy='lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError("policy harus 'lru' atau 'lfu'")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Mengosongkan cache dan mereset statistik."""
+        with self.lock:
+            # key -> [postings, size, frequency]
+            self.entries = OrderedDict()
+            # Khusus LFU: frequency -> OrderedDict berisi key (urut dari yang paling lama)
+            self.frequency_buckets = {}
+            self.resident_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def entry_size(self, postings):
+        if isinstance(postings, array.array):
+            return len(postings) * postings.itemsize + self.ENTRY_OVERHEAD
+        return postings.nbytes + self.ENTRY_OVERHEAD
+
+    def get(self, key):
+        """Mengembalikan postings untuk key, atau None jika tidak ada di cache."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.policy == 'lru':
+                self.entries.move_to_end(key)
+            else:
+                self._touch_frequency(key, entry)
+            return entry[0]
+
+    def peek(self, key):
+        """
+        Seperti get(...), tetapi tidak mengubah statistik maupun urutan
+        eviction. Dipakai oleh pembacaan lazy yang tidak mengisi cache.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def put(self, key, postings):
+        """
+        Menyimpan postings (list atau array of docIDs, atau representasi lain
+        yang punya atribut nbytes seperti RoaringBitmap) ke cache, lalu
+        mengembalikan versi yang disimpan. List diubah menjadi array. Postings
+        yang lebih besar dari max_bytes tidak disimpan.
+        """
+        if not isinstance(postings, array.array) and not hasattr(postings, 'nbytes'):
+            postings = array.array('L', postings)
+        size = self.entry_size(postings)
+        if size > self.max_bytes:
+            return postings
+
+        with self.lock:
+            if key in self.entries:
+                return self.entries[key][0]
+            while self.resident_bytes + size > self.max_bytes:
+                self._evict()
+            entry = [postings, size, 1]
+            self.entries[key] = entry
+            self.resident_bytes += size
+            if self.policy == 'lfu':
+                self.frequency_buckets.setdefault(1, OrderedDict())[key] = None
+        return postings
+
+    def _touch_frequency(self, key, entry):
+        """LFU: pindahkan key dari bucket frequency f ke bucket f + 1."""
+        frequency = entry[2]
+        bucket = self.frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_buckets[frequency]
+        entry[2] = frequency + 1
+        self.frequency_buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def _evict(self):
+        """Membuang satu entry sesuai policy (dipanggil saat lock dipegang)."""
+        if self.policy == 'lru':
+            key, entry = self.entries.popitem(last=False)
+        else:
+            min_frequency = min(self.frequency_buckets)
+            bucket = self.frequency_buckets[min_frequency]
+            key, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self.frequency_buckets[min_frequency]
+            entry = self.entries.pop(key)
+        self.resident_bytes -= entry[1]
+        self.evictions += 1
+
+    def stats(self):
+        """Mengembalikan statistik cache: hits, misses, hit_rate, evictions, entries, resident_bytes."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / total if total else 0.0,
+                    'evictions': self.evictions,
+                    'entries': len(self.entries),
+                    'resident_bytes': self.resident_bytes}
+
 
 class InvertedIndex:
     """
@@ -9,7 +305,7 @@ class InvertedIndex:
 
     Attributes
     ----------
-    postings_dict: Dictionary mapping:
+    postings_dict: TermDictionary, mapping:
 
             termID -> (start_position_in_index_file,
                        number_of_postings_in_list,
@@ -19,8 +315,8 @@ class InvertedIndex:
         Inverted Index. postings_dict ini diasumsikan dapat dimuat semuanya
         di memori.
 
-        Seperti namanya, "Dictionary" diimplementasikan sebagai python's Dictionary
-        yang memetakan term ID (integer) ke 3-tuple:
+        "Dictionary" ini diimplementasikan sebagai TermDictionary (array paralel
+        yang compact, lihat di atas) yang memetakan term ID (integer) ke 3-tuple:
            1. start_position_in_index_file : (dalam satu bytes) posisi dimana
               postings yang bersesuaian berada di file (storage). Kita bisa
               menggunakan operasi "seek" untuk mencapainya.
@@ -29,12 +325,12 @@ class InvertedIndex:
            3. length_in_bytes_of_postings_list : panjang postings list dalam
               satuan byte.
 
-    terms: List[int]
+    terms: array of int
         List of terms IDs, untuk mengingat urutan terms yang dimasukan ke
-        dalam Inverted Index.
+        dalam Inverted Index (sama dengan postings_dict.term_ids).
 
     """
-    def __init__(self, index_name, encoding_method, path=''):
+    def __init__(self, index_name, encoding_method, path='', buffer_size=-1):
         """
         Parameters
         ----------
@@ -42,16 +338,24 @@ class InvertedIndex:
         encoding_method : Lihat di compression.py, kandidatnya adalah StandardPostings,
                         GapBasedPostings, dsb.
         path (str): path dimana file index berada
+        buffer_size (int): ukuran buffer (dalam bytes) untuk membuka index file;
+                        -1 berarti ukuran default. Buffer yang besar berguna ketika
+                        index dibaca secara sekuensial, misalnya saat merging.
         """
 
         self.encoding_method = encoding_method
         self.path = path
+        self.buffer_size = buffer_size
 
         self.index_file_path = os.path.join(path, index_name+'.index')
         self.metadata_file_path = os.path.join(path, index_name+'.dict')
 
-        self.postings_dict = {}
-        self.terms = []         # Untuk keep track urutan term yang dimasukkan ke index
+        self.postings_dict = TermDictionary()
+
+    @property
+    def terms(self):
+        """Urutan term yang dimasukkan ke index"""
+        return self.postings_dict.term_ids
 
     def __enter__(self):
         """
@@ -61,38 +365,68 @@ class InvertedIndex:
             2. iterator untuk List yang berisi urutan term yang masuk ke
                 index saat konstruksi. ---> term_iter
 
-        Metadata disimpan ke file dengan bantuan library "pickle"
+        Metadata disimpan ke file dalam format binary TermDictionary (file
+        metadata lama yang disimpan dengan "pickle" tetap bisa dimuat).
 
         Perlu memahani juga special method __enter__(..) pada Python dan juga
         konsep Context Manager di Python. Silakan pelajari link berikut:
 
         https://docs.python.org/3/reference/datamodel.html#object.__enter__
         """
-        # Membuka index file
-        self.index_file = open(self.index_file_path, 'rb+')
+        # Membuka index file (read-only; hanya InvertedIndexWriter yang menulis)
+        self.index_file = open(self.index_file_path, 'rb', buffering=self.buffer_size)
 
         # Kita muat postings dict dan terms iterator dari file metadata
-        with open(self.metadata_file_path, 'rb') as f:
-            self.postings_dict, self.terms = pickle.load(f)
-            self.term_iter = self.terms.__iter__()
+        self.postings_dict = TermDictionary.load(self.metadata_file_path)
+        self.term_iter = self.terms.__iter__()
 
         return self
 
     def __exit__(self, exception_type, exception_value, traceback):
-        """Menutup index_file dan menyimpan postings_dict dan terms ketika keluar context"""
+        """Menutup index_file ketika keluar context"""
         # Menutup index file
         self.index_file.close()
 
-        # Menyimpan metadata (postings dict dan terms) ke file metadata dengan bantuan pickle
-        with open(self.metadata_file_path, 'wb') as f:
-            pickle.dump([self.postings_dict, self.terms], f)
-
 
 class InvertedIndexReader(InvertedIndex):
     """
     Class yang mengimplementasikan bagaimana caranya scan atau membaca secara
     efisien Inverted Index yang disimpan di sebuah file.
+
+    Jika use_mmap bernilai True, index file di-mmap dan setiap postings list
+    diberikan ke encoding_method.decode(...) sebagai memoryview slice dari
+    mapping tersebut, tanpa seek/read syscall dan tanpa menyalin ke bytes.
+
+    Jika cache (PostingsCache) diberikan, get_postings_list(...) dan
+    get_postings_view(...) menyimpan postings yang sudah di-decode ke cache
+    tersebut. Cache boleh dipakai bersama oleh beberapa reader.
     """
+    def __init__(self, index_name, encoding_method, path='', buffer_size=-1, use_mmap=False, cache=None):
+        super().__init__(index_name, encoding_method, path, buffer_size)
+        self.use_mmap = use_mmap
+        self.index_mmap = None
+        self.index_view = None
+        self.cache = cache
+        # seek + read pada index_file tidak boleh diselingi thread lain
+        self.file_lock = threading.Lock()
+
+    def __enter__(self):
+        super().__enter__()
+        # mmap tidak bisa dibuat untuk file kosong; untuk kasus itu pakai read biasa
+        if self.use_mmap and os.fstat(self.index_file.fileno()).st_size > 0:
+            self.index_mmap = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index_view = memoryview(self.index_mmap)
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        # memoryview harus dilepas terlebih dahulu sebelum mmap bisa ditutup
+        if self.index_view is not None:
+            self.index_view.release()
+            self.index_mmap.close()
+            self.index_view = None
+            self.index_mmap = None
+        super().__exit__(exception_type, exception_value, traceback)
+
     def __iter__(self):
         return self
 
@@ -124,7 +458,17 @@ class InvertedIndexReader(InvertedIndex):
         
         # Mengambil term_id selanjutnya, lalu ambil postings_list yang sesuai
         term_id = next(self.term_iter)
-        postings_list = self.get_postings_list(term_id)
+        start, _, length_postings_byte = self.postings_dict[term_id]
+
+        if self.index_view is not None:
+            return (term_id, self.encoding_method.decode(self.index_view[start:start + length_postings_byte]))
+
+        # Postings list ditulis berurutan sesuai urutan terms, sehingga biasanya
+        # file pointer sudah berada di posisi yang tepat dan cukup dibaca
+        # sekuensial (memanfaatkan buffer) tanpa seek.
+        if self.index_file.tell() != start:
+            self.index_file.seek(start)
+        postings_list = self.encoding_method.decode(self.index_file.read(length_postings_byte))
 
         return (term_id, postings_list)
 
@@ -140,27 +484,132 @@ class InvertedIndexReader(InvertedIndex):
         # Return list kosong jika term tidak ada di postings_dict
         if term not in self.postings_dict:
             return []
-        
-        start, _, length_postings_byte = self.postings_dict[term]
 
-        # Ubah pointer
-        self.index_file.seek(start)
+        if self.cache is None:
+            return self.encoding_method.decode(self.read_postings_bytes(term))
 
-        # Baca index lalu decode
-        postings_encoded = self.index_file.read(length_postings_byte)
-        postings_list = self.encoding_method.decode(postings_encoded)
-        
+        key = (self.index_file_path, term)
+        postings_list = self.cache.get(key)
+        if postings_list is None:
+            postings_list = self.cache.put(key, self.encoding_method.decode(self.read_postings_bytes(term)))
         return postings_list
 
+    def read_postings_bytes(self, term):
+        """
+        Mengembalikan bytes postings list (yang masih ter-encode) dari sebuah
+        term. Pada mode mmap, yang dikembalikan adalah memoryview slice dari
+        mapping (zero-copy).
+        """
+        start, _, length_postings_byte = self.postings_dict[term]
+
+        # Pada mode mmap, decode langsung dari slice mapping (zero-copy)
+        if self.index_view is not None:
+            return self.index_view[start:start + length_postings_byte]
+
+        with self.file_lock:
+            # Ubah pointer
+            self.index_file.seek(start)
+
+            # Baca index
+            return self.index_file.read(length_postings_byte)
+
+    def iter_postings(self, term):
+        """
+        Mengembalikan iterable docIDs (terurut) dari postings list sebuah
+        term, yang men-decode postings secara lazy jika encoding_method
+        mendukungnya (iter_decode, atau view yang di-decode per block).
+        Dipakai untuk evaluasi query secara lazy (QueryPlan.iterate), sehingga
+        pembacaan bisa berhenti begitu hasil yang diminta sudah terpenuhi.
+        View dan postings yang sudah ada di cache dikembalikan apa adanya
+        (bukan iterator), supaya util.PostingsCursor bisa melompat di dalamnya.
+        """
+        if term not in self.postings_dict:
+            return ()
+        if self.cache is not None:
+            postings_list = self.cache.peek((self.index_file_path, term))
+            if postings_list is not None:
+                return postings_list
+
+        data = self.read_postings_bytes(term)
+        iter_decode = getattr(self.encoding_method, 'iter_decode', None)
+        if iter_decode is not None:
+            return iter_decode(data)
+        view = getattr(self.encoding_method, 'view', None)
+        if view is not None:
+            return view(data)
+        return self.encoding_method.decode(data)
+
+    def get_postings_view(self, term):
+        """
+        Seperti get_postings_list(...), tetapi jika encoding_method mendukung
+        representasi lazy (misalnya SkipVBEPostings.view), yang dikembalikan
+        adalah representasi lazy tersebut sehingga postings tidak perlu
+        di-decode seluruhnya.
+
+        Jika cache aktif, postings yang muat di cache tetap di-decode penuh
+        dan disimpan di cache; hanya postings yang lebih besar dari kapasitas
+        cache yang dikembalikan dalam bentuk lazy.
+        """
+        view = getattr(self.encoding_method, 'view', None)
+        if view is None or term not in self.postings_dict:
+            return self.get_postings_list(term)
+
+        if self.cache is not None:
+            _, df, _ = self.postings_dict[term]
+            if df * array.array('L').itemsize + self.cache.ENTRY_OVERHEAD <= self.cache.max_bytes:
+                return self.get_postings_list(term)
+        return view(self.read_postings_bytes(term))
+
+    def get_postings_views(self, terms):
+        """
+        Versi batch dari get_postings_view(...): mengembalikan dict term ->
+        postings, dengan postings dibaca urut berdasarkan posisinya di index
+        file sehingga pembacaan index menjadi sekuensial. Term yang tidak
+        ada di index mendapat list kosong.
+        """
+        postings_dict = self.postings_dict
+        present = sorted((term for term in terms if term in postings_dict), key=lambda term: postings_dict[term][0])
+        result = {term: [] for term in terms}
+        for term in present:
+            result[term] = self.get_postings_view(term)
+        return result
+
 class InvertedIndexWriter(InvertedIndex):
     """
     Class yang mengimplementasikan bagaimana caranya menulis secara
     efisien Inverted Index yang disimpan di sebuah file.
+
+    Index file dan metadata ditulis ke file sementara (<nama>.tmp), lalu
+    di-rename ke tempatnya saat keluar context. File index lama tidak
+    pernah di-truncate, sehingga reader yang sedang membukanya (termasuk
+    lewat mmap) tetap membaca index lama sampai dibuka ulang.
     """
     def __enter__(self):
-        self.index_file = open(self.index_file_path, 'wb+')
+        self.index_file = open(self.index_file_path + '.tmp', 'wb+')
         return self
 
+    def __exit__(self, exception_type, exception_value, traceback):
+        """
+        Menutup index_file dan menyimpan postings_dict dan terms ketika keluar
+        context. Kedua file sementara di-rename berpasangan (index file
+        terlebih dahulu, lalu metadata), sehingga reader tidak pernah melihat
+        file yang setengah jadi. Jika terjadi exception, file sementara
+        dibuang dan index lama dibiarkan.
+        """
+        # Menutup index file
+        self.index_file.close()
+        tmp_index_path = self.index_file_path + '.tmp'
+        if exception_type is not None:
+            os.remove(tmp_index_path)
+            return
+
+        # Menyimpan metadata (postings dict, yang sekaligus memuat urutan terms) ke file metadata
+        tmp_metadata_path = self.metadata_file_path + '.tmp'
+        with open(tmp_metadata_path, 'wb') as f:
+            f.write(self.postings_dict.to_bytes())
+        os.replace(tmp_index_path, self.index_file_path)
+        os.replace(tmp_metadata_path, self.metadata_file_path)
+
     def append(self, term, postings_list):
         """
         Menambahkan (append) sebuah term dan juga postings_list yang terasosiasi
@@ -191,9 +640,8 @@ class InvertedIndexWriter(InvertedIndex):
         postings_list: List[Int]
             List of docIDs dimana term muncul
         """
-        # Encode postings list lalu masukkan term ke properti terms
+        # Encode postings list (term otomatis tercatat di terms saat dimasukkan ke postings_dict)
         postings_encoded = self.encoding_method.encode(postings_list)
-        self.terms.append(term)
 
         # Ambil pointer saat ini lalu simpan sebagai posisi awal postings list di storage
         current_pointer = self.index_file.tell()
@@ -204,6 +652,132 @@ class InvertedIndexWriter(InvertedIndex):
 
         return []
 
+
+class SegmentPostingsDict(Mapping):
+    """
+    Gabungan postings_dict dari beberapa segment (lihat SegmentedIndexReader).
+    Untuk sebuah term, nilainya adalah (posisi di segment pertama yang memuat
+    term tersebut, total df di semua segment, total panjang postings dalam
+    bytes), sehingga bisa dipakai query planner seperti postings_dict biasa.
+    """
+    def __init__(self, postings_dicts):
+        self.postings_dicts = postings_dicts
+
+    def __getitem__(self, term):
+        entries = [postings_dict[term] for postings_dict in self.postings_dicts if term in postings_dict]
+        if not entries:
+            raise KeyError(term)
+        return (entries[0][0], sum(entry[1] for entry in entries), sum(entry[2] for entry in entries))
+
+    def __contains__(self, term):
+        return any(term in postings_dict for postings_dict in self.postings_dicts)
+
+    def __iter__(self):
+        last = None
+        for term in heapq.merge(*(sorted(postings_dict) for postings_dict in self.postings_dicts)):
+            if term != last:
+                yield term
+                last = term
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class SegmentedIndexReader:
+    """
+    Membaca beberapa segment index (masing-masing sebuah InvertedIndexReader)
+    sebagai satu index. docID setiap segment tidak overlap dan naik sesuai
+    urutan segment, sehingga postings list sebuah term adalah gabungan
+    (concatenation) postings list-nya di setiap segment, sesuai urutan.
+
+    Interface-nya sama dengan InvertedIndexReader untuk keperluan query
+    (postings_dict, get_postings_list, get_postings_view, get_postings_views,
+    iter_postings).
+
+    Parameters
+    ----------
+    readers: List[InvertedIndexReader]
+        Reader setiap segment, terurut berdasarkan docID
+    """
+    def __init__(self, readers):
+        self.readers = readers
+        self.stack = None
+        self.postings_dict = None
+
+    def __enter__(self):
+        with contextlib.ExitStack() as stack:
+            for reader in self.readers:
+                stack.enter_context(reader)
+            self.stack = stack.pop_all()
+        self.postings_dict = SegmentPostingsDict([reader.postings_dict for reader in self.readers])
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stack.close()
+
+    @property
+    def terms(self):
+        return list(self.postings_dict)
+
+    def segment_postings(self, term, method):
+        return [method(reader, term) for reader in self.readers if term in reader.postings_dict]
+
+    def get_postings_list(self, term):
+        """Postings list sebuah term dari semua segment, lihat InvertedIndexReader.get_postings_list."""
+        return concat_postings(self.segment_postings(term, InvertedIndexReader.get_postings_list))
+
+    def get_postings_view(self, term):
+        """
+        Seperti InvertedIndexReader.get_postings_view. Jika term hanya ada di
+        satu segment, representasi lazy/bitmap segment tersebut dipertahankan.
+        """
+        return concat_postings(self.segment_postings(term, InvertedIndexReader.get_postings_view))
+
+    def get_postings_views(self, terms):
+        """
+        Seperti InvertedIndexReader.get_postings_views. Posisi di index file
+        hanya bermakna di dalam satu segment, sehingga pembacaan diurutkan
+        per segment (segment demi segment, sesuai urutan docID), lalu
+        bagian-bagian postings setiap term digabung dengan concat_postings.
+        """
+        terms = list(terms)
+        parts = {term: [] for term in terms}
+        for reader in self.readers:
+            for term, postings in reader.get_postings_views(
+                    [term for term in terms if term in reader.postings_dict]).items():
+                parts[term].append(postings)
+        return {term: concat_postings(term_parts) for term, term_parts in parts.items()}
+
+    def iter_postings(self, term):
+        """Iterable docIDs sebuah term dari semua segment, lihat InvertedIndexReader.iter_postings."""
+        parts = self.segment_postings(term, InvertedIndexReader.iter_postings)
+        if len(parts) == 1:
+            return parts[0]
+        return itertools.chain.from_iterable(parts)
+
+
+def concat_postings(parts):
+    """
+    Menggabungkan postings list dari beberapa segment (docID antar part
+    tidak overlap dan sudah terurut sesuai urutan part). Jika semuanya
+    bitmap (punya method union), hasilnya tetap bitmap; jika tidak, hasilnya
+    array of docIDs.
+    """
+    if len(parts) == 0:
+        return []
+    if len(parts) == 1:
+        return parts[0]
+    if all(hasattr(part, 'union') for part in parts):
+        result = parts[0]
+        for part in parts[1:]:
+            result = result.union(part)
+        return result
+    result = array.array('L')
+    for part in parts:
+        result.extend(part.to_array() if hasattr(part, 'to_array') else part)
+    return result
+
+
 if __name__ == "__main__":
 
     from compression import StandardPostings, VBEPostings
@@ -212,7 +786,7 @@ if __name__ == "__main__":
         index.append(1, [2, 3, 4, 8, 10])
         index.append(2, [3, 4, 5])
         index.index_file.seek(0)
-        assert index.terms == [1,2], "terms salah"
+        assert list(index.terms) == [1,2], "terms salah"
         assert index.postings_dict == {1: (0, 5, len(StandardPostings.encode([2,3,4,8,10]))),
                                        2: (len(StandardPostings.encode([2,3,4,8,10])), 3,
                                            len(StandardPostings.encode([3,4,5])))}, "postings dictionary salah"
@@ -229,15 +803,66 @@ if __name__ == "__main__":
         index.append(1, [2, 3, 4, 8, 10])
         index.append(2, [3, 4, 5])
         index.index_file.seek(0)
-        assert index.terms == [1,2], "terms salah"
+        assert list(index.terms) == [1,2], "terms salah"
         assert index.postings_dict == {1: (0, 5, len(VBEPostings.encode([2,3,4,8,10]))),
                                        2: (len(VBEPostings.encode([2,3,4,8,10])), 3,
                                            len(VBEPostings.encode([3,4,5])))}, "postings dictionary salah"
-        assert VBEPostings.decode(index.index_file.read()) == [2, 3, 4, 8, 10, 13, 14, 15], "penyimpanan postings pada harddisk salah"
+        assert list(VBEPostings.decode(index.index_file.read())) == [2, 3, 4, 8, 10, 13, 14, 15], "penyimpanan postings pada harddisk salah"
         
         index.index_file.seek(index.postings_dict[2][0])
-        assert VBEPostings.decode(index.index_file.read(len(VBEPostings.encode([3,4,5])))) == [3,4,5], "terdapat kesalahan"
+        assert list(VBEPostings.decode(index.index_file.read(len(VBEPostings.encode([3,4,5]))))) == [3,4,5], "terdapat kesalahan"
 
         index.index_file.seek(0)
-        assert VBEPostings.decode(index.index_file.read(index.postings_dict[1][2])) == [2, 3, 4, 8, 10], "terdapat kesalahan"
-        assert VBEPostings.decode(index.index_file.read(index.postings_dict[2][2])) == [3, 4, 5], "terdapat kesalahan"
+        assert list(VBEPostings.decode(index.index_file.read(index.postings_dict[1][2]))) == [2, 3, 4, 8, 10], "terdapat kesalahan"
+        assert list(VBEPostings.decode(index.index_file.read(index.postings_dict[2][2]))) == [3, 4, 5], "terdapat kesalahan"
+
+    term_dict = TermDictionary()
+    term_dict[3], term_dict[10] = (0, 2, 5), (5, 1, 2)
+    restored = TermDictionary.from_bytes(term_dict.to_bytes())
+    assert restored == {3: (0, 2, 5), 10: (5, 1, 2)} and list(restored) == [3, 10], \
+        "serialisasi TermDictionary salah"
+    assert 4 not in restored and restored.get(11) is None, "lookup TermDictionary salah"
+
+    cache = PostingsCache(max_bytes=2 * PostingsCache.ENTRY_OVERHEAD + 64, policy='lfu')
+    cache.put('a', [1, 2, 3])
+    cache.put('b', [4, 5])
+    assert list(cache.get('a')) == [1, 2, 3] and cache.get('c') is None, "PostingsCache salah"
+    cache.put('c', [6])
+    assert cache.get('b') is None and list(cache.get('a')) == [1, 2, 3], "eviction LFU salah"
+    assert cache.stats()['evictions'] == 1, "statistik PostingsCache salah"
+
+    for use_mmap, cache in [(False, None), (True, None), (False, PostingsCache(1 << 20))]:
+        with InvertedIndexReader('test', encoding_method=VBEPostings, path='./tmp/', use_mmap=use_mmap,
+                                 cache=cache) as index:
+            assert list(index.get_postings_list(2)) == [3, 4, 5], "get_postings_list salah"
+            assert list(index.get_postings_list(3)) == [], "get_postings_list salah"
+            assert [(term, list(postings)) for term, postings in index] == [(1, [2, 3, 4, 8, 10]), (2, [3, 4, 5])], \
+                "iterasi index salah"
+            if cache is not None:
+                assert list(index.get_postings_list(2)) == [3, 4, 5], "get_postings_list dari cache salah"
+                assert cache.stats()['hits'] == 1 and len(cache) == 1, "statistik PostingsCache salah"
+            assert list(index.iter_postings(1)) == [2, 3, 4, 8, 10], "iter_postings salah"
+            assert list(index.iter_postings(3)) == [], "iter_postings salah"
+
+    with InvertedIndexWriter('test_segment', encoding_method=VBEPostings, path='./tmp/') as index:
+        index.append(2, [12, 13])
+        index.append(5, [11])
+    with SegmentedIndexReader([InvertedIndexReader('test', VBEPostings, path='./tmp/'),
+                               InvertedIndexReader('test_segment', VBEPostings, path='./tmp/')]) as index:
+        assert list(index.postings_dict) == [1, 2, 5] and index.postings_dict[2][1] == 5, "SegmentPostingsDict salah"
+        assert list(index.get_postings_list(2)) == [3, 4, 5, 12, 13], "postings antar segment salah"
+        assert list(index.iter_postings(5)) == [11] and list(index.get_postings_view(1)) == [2, 3, 4, 8, 10], \
+            "postings antar segment salah"
+        views = index.get_postings_views([5, 2, 9])
+        assert {term: list(postings) for term, postings in views.items()} == {5: [11], 2: [3, 4, 5, 12, 13], 9: []}, \
+            "get_postings_views antar segment salah"
+
+    # Menulis ulang segment yang sedang di-mmap tidak boleh mengubah isi yang sedang dibaca
+    with InvertedIndexReader('test_segment', VBEPostings, path='./tmp/', use_mmap=True) as old_index:
+        with InvertedIndexWriter('test_segment', encoding_method=VBEPostings, path='./tmp/') as index:
+            index.append(7, [1])
+        assert list(old_index.get_postings_list(2)) == [12, 13], "index lama terpotong saat ditulis ulang"
+    with InvertedIndexReader('test_segment', VBEPostings, path='./tmp/') as index:
+        assert list(index.postings_dict) == [7], "index baru tidak terpasang"
+    for extension in ('.index', '.dict'):
+        os.remove('./tmp/test_segment' + extension)
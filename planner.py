@@ -0,0 +1,417 @@
+from compression import RoaringBitmap, SkipPostingsView
+from util import diff_many, intersect_many, iter_diff, iter_intersect, iter_union, skip_diff_list, \
+    skip_intersect_list, sort_intersect_list, union_many
+
+# Postings dengan skip pointers yang lebih dari GALLOP_RATIO kali lebih
+# panjang dari list terpendek cukup di-probe lewat skip entries-nya; dua list
+# yang panjangnya tidak terlalu berbeda di-intersect dengan linear merge
+GALLOP_RATIO = 8
+
+
+def as_postings_list(postings):
+    """Men-decode postings yang masih lazy (SkipPostingsView) atau bitmap (RoaringBitmap) menjadi array of docIDs."""
+    if isinstance(postings, (SkipPostingsView, RoaringBitmap)):
+        return postings.to_array()
+    return postings
+
+
+def split_postings(postings, shortest):
+    """
+    Memisahkan postings menjadi (lists, views, bitmaps): postings biasa yang
+    sudah di-decode, SkipPostingsView yang lebih dari GALLOP_RATIO kali lebih
+    panjang dari shortest (cukup di-probe), dan RoaringBitmap.
+    """
+    lists, views, bitmaps = [], [], []
+    for item in postings:
+        if isinstance(item, RoaringBitmap):
+            bitmaps.append(item)
+        elif isinstance(item, SkipPostingsView) and len(item) > GALLOP_RATIO * shortest:
+            views.append(item)
+        else:
+            lists.append(as_postings_list(item))
+    return lists, views, bitmaps
+
+
+def intersect_postings(postings):
+    """
+    Intersection n-ary dari beberapa postings. Postings biasa di-intersect
+    sekaligus dengan util.intersect_many (atau linear merge jika hanya dua
+    list dengan panjang yang mirip), lalu hasilnya di-probe ke postings
+    dengan skip pointers yang panjang dan ke bitmap. Jika semua operand
+    adalah RoaringBitmap, intersection dikerjakan per word.
+    """
+    lists, views, bitmaps = split_postings(postings, min(len(item) for item in postings))
+    if not lists and not views:
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result.intersection(bitmap)
+        return result
+
+    if not lists:
+        # Semua postings biasa adalah view panjang; yang terpendek menjadi driver
+        views.sort(key=len)
+        lists.append(views.pop(0).to_array())
+    lists.sort(key=len)
+    if len(lists) == 2 and len(lists[1]) <= GALLOP_RATIO * len(lists[0]):
+        result = sort_intersect_list(lists[0], lists[1])
+    else:
+        result = intersect_many(lists)
+    for view in views:
+        result = skip_intersect_list(result, view)
+    for bitmap in bitmaps:
+        result = bitmap.intersection(result)
+    return result
+
+
+def union_postings(postings):
+    """
+    Union n-ary dari beberapa postings dengan util.union_many (k-way merge).
+    Bitmap di-union per word, dan jika ada bitmap, hasilnya RoaringBitmap.
+    """
+    lists = [as_postings_list(item) for item in postings if not isinstance(item, RoaringBitmap)]
+    bitmaps = [item for item in postings if isinstance(item, RoaringBitmap)]
+    result = union_many(lists) if lists else []
+    if not bitmaps:
+        return result
+    bitmap_result = bitmaps[0]
+    for bitmap in bitmaps[1:] + ([result] if result else []):
+        bitmap_result = bitmap_result.union(bitmap)
+    return bitmap_result
+
+
+def diff_postings(postings_A, subtrahends):
+    """
+    Difference n-ary: postings_A - (subtrahends[0] U subtrahends[1] U ...).
+    Postings biasa dikurangkan sekaligus dengan util.diff_many, lalu hasilnya
+    di-probe ke postings dengan skip pointers yang panjang dan ke bitmap.
+    """
+    if isinstance(postings_A, RoaringBitmap):
+        for item in subtrahends:
+            postings_A = postings_A.difference(item if isinstance(item, RoaringBitmap) else as_postings_list(item))
+        return postings_A
+
+    list_A = as_postings_list(postings_A)
+    lists, views, bitmaps = split_postings(subtrahends, len(list_A))
+    result = diff_many(list_A, lists)
+    for view in views:
+        result = skip_diff_list(result, view)
+    for bitmap in bitmaps:
+        result = [doc_id for doc_id in result if doc_id not in bitmap]
+    return result
+
+
+class TermNode:
+    """
+    Daun pada query plan: sebuah term (yang sudah di-stem).
+
+    Attributes
+    ----------
+    term: str
+    term_id: int atau None
+        None jika term tidak ada di collection
+    estimate: int
+        Perkiraan banyaknya dokumen hasil, yaitu df term dari postings_dict
+    actual: int atau None
+        Banyaknya dokumen hasil sebenarnya; None jika node tidak dievaluasi
+    """
+    def __init__(self, term, term_id, df):
+        self.term = term
+        self.term_id = term_id
+        self.estimate = df
+        self.actual = None
+
+    def execute(self, fetch):
+        if self.estimate == 0:
+            # Term tidak ada di collection, tidak perlu membaca index
+            result = []
+        else:
+            result = fetch(self.term_id)
+        self.actual = len(result)
+        return result
+
+    def iterate(self, fetch):
+        if self.estimate == 0:
+            return ()
+        # Tidak dibungkus iter(...), supaya iter_intersect bisa melompat di
+        # postings yang mendukungnya (array atau SkipPostingsView)
+        return fetch(self.term_id)
+
+    def describe(self):
+        return f"TERM {self.term}"
+
+
+class OperatorNode:
+    """
+    Node operator pada query plan. Semua operator bersifat n-ary: operand
+    AND/OR yang bersebelahan dengan operator yang sama sudah di-flatten, dan
+    rantai DIFF (a DIFF b DIFF c) menjadi children[0] - children[1] - ...,
+    sehingga OR dan DIFF dievaluasi dengan satu operasi n-ary (lihat
+    union_postings dan diff_postings). AND dievaluasi progresif sesuai
+    urutan estimate (lihat intersect_postings), sehingga bisa berhenti
+    sebelum membaca operand yang panjang.
+
+    Attributes
+    ----------
+    operator: str
+        'AND', 'OR', atau 'DIFF'
+    children: List[TermNode atau OperatorNode]
+        Operand; untuk AND sudah diurutkan berdasarkan estimate menaik
+    estimate: int
+        Perkiraan banyaknya dokumen hasil
+    actual: int atau None
+        Banyaknya dokumen hasil sebenarnya; None jika node tidak dievaluasi
+    """
+    def __init__(self, operator, children, n_docs):
+        self.operator = operator
+        self.children = children
+        self.actual = None
+        estimates = [child.estimate for child in children]
+        if operator == 'AND':
+            # Mulai dari operand dengan df terkecil
+            self.children.sort(key=lambda child: child.estimate)
+            self.estimate = min(estimates)
+        elif operator == 'OR':
+            self.estimate = min(sum(estimates), n_docs)
+        else:
+            self.estimate = estimates[0]
+
+    def execute(self, fetch):
+        if self.operator == 'AND':
+            # Dievaluasi progresif mulai dari operand dengan df terkecil: hasil
+            # sementara di-intersect dengan operand berikutnya, dan begitu
+            # hasilnya kosong, operand sisanya (yang lebih panjang) tidak dibaca
+            result = self.children[0].execute(fetch)
+            for child in self.children[1:]:
+                if len(result) == 0:
+                    break
+                result = intersect_postings([result, child.execute(fetch)])
+        elif self.operator == 'OR':
+            result = union_postings([child.execute(fetch) for child in self.children])
+        else:
+            result = self.children[0].execute(fetch)
+            if len(result) > 0:
+                subtrahends = [child.execute(fetch) for child in self.children[1:] if child.estimate > 0]
+                if subtrahends:
+                    result = diff_postings(result, subtrahends)
+        self.actual = len(result)
+        return result
+
+    def iterate(self, fetch):
+        """Versi lazy dari execute(...): generator docIDs terurut, lihat QueryPlan.iterate."""
+        if self.operator == 'AND':
+            if self.children[0].estimate == 0:
+                return ()
+            return iter_intersect([child.iterate(fetch) for child in self.children])
+        if self.operator == 'OR':
+            return iter_union([child.iterate(fetch) for child in self.children])
+        return iter_diff(self.children[0].iterate(fetch),
+                         [child.iterate(fetch) for child in self.children[1:] if child.estimate > 0])
+
+    def describe(self):
+        return self.operator
+
+
+class QueryPlan:
+    """
+    Query plan hasil build_plan(...). Dievaluasi dengan execute(fetch), dan
+    explain() menampilkan plan beserta perkiraan dan ukuran hasil sebenarnya.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def execute(self, fetch):
+        """
+        Mengevaluasi plan. fetch(term_id) harus mengembalikan postings dari
+        term tersebut. Mengembalikan postings hasil (list/array of docIDs).
+        """
+        if self.root is None:
+            return []
+        return as_postings_list(self.root.execute(fetch))
+
+    def iterate(self, fetch):
+        """
+        Mengevaluasi plan secara lazy: mengembalikan iterator docIDs hasil
+        yang terurut menaik. Operator AND/OR/DIFF dievaluasi sebagai
+        generator (lihat util.iter_intersect, iter_union, dan iter_diff),
+        sehingga jika pemanggil hanya mengambil beberapa docID pertama,
+        postings hanya dibaca sejauh yang dibutuhkan. fetch(term_id) boleh
+        mengembalikan iterator (misalnya InvertedIndexReader.iter_postings);
+        untuk AND, operand berupa array atau SkipPostingsView dilompati
+        dengan galloping/skip pointers (lihat util.PostingsCursor).
+        Nilai actual pada node tidak diisi pada mode ini.
+        """
+        if self.root is None:
+            return iter(())
+        return iter(self.root.iterate(fetch))
+
+    def term_ids(self):
+        """Mengembalikan termID semua term pada plan yang postings-nya perlu dibaca (df > 0)."""
+        term_ids = set()
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, TermNode):
+                if node.estimate > 0:
+                    term_ids.add(node.term_id)
+            else:
+                nodes.extend(node.children)
+        return term_ids
+
+    def explain(self):
+        """Mengembalikan representasi plan (satu node per baris) sebagai string."""
+        lines = []
+
+        def visit(node, depth):
+            actual = '-' if node.actual is None else node.actual
+            lines.append(f"{'  ' * depth}{node.describe()} (estimasi={node.estimate}, aktual={actual})")
+            for child in getattr(node, 'children', []):
+                visit(child, depth + 1)
+
+        if self.root is not None:
+            visit(self.root, 0)
+        return '\n'.join(lines)
+
+
+def build_plan(postfix_tokens, term_id_map, postings_dict, n_docs):
+    """
+    Membangun query plan dari ekspresi postfix (keluaran
+    QueryParser.infix_to_postfix()). Operator AND/OR (dan rantai DIFF) yang
+    berulang di-flatten menjadi satu node n-ary, operand AND diurutkan dari
+    df terkecil, dan df diambil dari postings_dict (number_of_postings_in_list).
+
+    Parameters
+    ----------
+    postfix_tokens: List[str]
+    term_id_map: IdMap
+    postings_dict: TermDictionary
+        postings_dict dari main index
+    n_docs: int
+        Banyaknya dokumen di collection (batas atas estimasi OR)
+
+    Returns
+    -------
+    QueryPlan
+    """
+    stack = []
+    for token in postfix_tokens:
+        if token in ('AND', 'OR', 'DIFF'):
+            right = stack.pop()
+            left = stack.pop()
+            if token == 'DIFF':
+                # (a DIFF b) DIFF c = a - b - c; hanya operand kiri yang boleh di-flatten
+                if isinstance(left, OperatorNode) and left.operator == 'DIFF':
+                    children = left.children + [right]
+                else:
+                    children = [left, right]
+            else:
+                # Flatten operand yang operatornya sama (AND dan OR asosiatif)
+                children = []
+                for child in (left, right):
+                    if isinstance(child, OperatorNode) and child.operator == token:
+                        children.extend(child.children)
+                    else:
+                        children.append(child)
+            stack.append(OperatorNode(token, children, n_docs))
+        else:
+            term_id = term_id_map.get(token)
+            df = postings_dict[term_id][1] if term_id in postings_dict else 0
+            stack.append(TermNode(token, term_id, df))
+
+    return QueryPlan(stack[0] if stack else None)
+
+
+def canonical_query(postfix_tokens):
+    """
+    Mengembalikan bentuk kanonik (hashable) dari ekspresi postfix, sehingga
+    query yang ekuivalen menghasilkan key yang sama. Operand AND/OR yang
+    berulang di-flatten, diurutkan, dan duplikatnya dibuang (AND dan OR
+    komutatif dan idempoten), sedangkan urutan operand DIFF dipertahankan.
+
+    Contoh: ["b", "a", "AND", "c", "AND"] dan ["a", "c", "b", "AND", "AND"]
+    sama-sama menjadi ('AND', ('a', 'b', 'c')).
+
+    Parameters
+    ----------
+    postfix_tokens: List[str]
+        Keluaran QueryParser.infix_to_postfix()
+
+    Returns
+    -------
+    str atau tuple
+        Term untuk query satu kata, ('DIFF', kiri, kanan), atau
+        (operator, operand-operand terurut) untuk AND/OR. None jika
+        ekspresinya kosong.
+    """
+    stack = []
+    for token in postfix_tokens:
+        if token in ('AND', 'OR', 'DIFF'):
+            right = stack.pop()
+            left = stack.pop()
+            if token == 'DIFF':
+                stack.append(('DIFF', left, right))
+                continue
+            operands = set()
+            for child in (left, right):
+                if isinstance(child, tuple) and child[0] == token:
+                    operands.update(child[1])
+                else:
+                    operands.add(child)
+            if len(operands) == 1:
+                stack.append(operands.pop())
+            else:
+                stack.append((token, tuple(sorted(operands, key=repr))))
+        else:
+            stack.append(token)
+    return stack[0] if stack else None
+
+
+if __name__ == '__main__':
+    from util import IdMap
+
+    term_id_map = IdMap()
+    term_id_map.get_ids(["umum", "langka", "jarang", "lain"])
+    postings = {0: list(range(100)), 1: [5, 50], 2: [5, 7, 50, 60], 3: [6, 51, 70]}
+    postings_dict = {term_id: (0, len(docs), 0) for term_id, docs in postings.items()}
+
+    plan = build_plan(["umum", "langka", "AND", "jarang", "AND"], term_id_map, postings_dict, 100)
+    assert [child.term for child in plan.root.children] == ["langka", "jarang", "umum"], "urutan operand AND salah"
+    assert plan.execute(postings.__getitem__) == [5, 50], "evaluasi plan salah"
+
+    fetched = []
+    plan = build_plan(["tidakada", "umum", "AND", "langka", "DIFF"], term_id_map, postings_dict, 100)
+    assert plan.execute(lambda term_id: fetched.append(term_id) or postings[term_id]) == [], "evaluasi plan salah"
+    assert fetched == [], "postings yang tidak berpengaruh tidak boleh dibaca"
+    assert plan.term_ids() == {0, 1}, "term_ids salah"
+
+    plan = build_plan(["umum", "langka", "AND", "lain", "AND"], term_id_map, postings_dict, 100)
+    assert plan.execute(lambda term_id: fetched.append(term_id) or postings[term_id]) == [], "evaluasi plan salah"
+    assert fetched == [1, 3], "AND harus berhenti sebelum membaca postings yang panjang"
+
+    plan = build_plan(["umum", "langka", "DIFF", "jarang", "DIFF"], term_id_map, postings_dict, 100)
+    assert len(plan.root.children) == 3, "rantai DIFF harus di-flatten"
+    assert list(plan.execute(postings.__getitem__)) == [i for i in range(100) if i not in (5, 7, 50, 60)], \
+        "evaluasi DIFF n-ary salah"
+    plan = build_plan(["langka", "jarang", "OR", "langka", "OR"], term_id_map, postings_dict, 100)
+    assert list(plan.execute(postings.__getitem__)) == [5, 7, 50, 60], "evaluasi OR n-ary salah"
+
+    plan = build_plan(["umum", "langka", "jarang", "OR", "AND", "langka", "DIFF"], term_id_map, postings_dict, 100)
+    assert list(plan.iterate(postings.__getitem__)) == list(plan.execute(postings.__getitem__)) == [7, 60], \
+        "evaluasi lazy salah"
+    print(plan.explain())
+
+    # Operand AND yang panjang dengan skip pointers dilompati per block tanpa men-decode block di antaranya
+    from compression import SkipVBEPostings
+    long_view = SkipVBEPostings.view(SkipVBEPostings.encode(list(range(100000))))
+    decoded_blocks = []
+    decode_block = long_view.block
+    long_view.block = lambda i: decoded_blocks.append(i) or decode_block(i)
+    views = {0: long_view, 1: [5, 99990]}
+    plan = build_plan(["umum", "langka", "AND"], term_id_map, {0: (0, 100000, 0), 1: (0, 2, 0)}, 100000)
+    assert list(plan.iterate(views.__getitem__)) == [5, 99990], "evaluasi lazy dengan skip pointers salah"
+    assert decoded_blocks == [0, 99990 // SkipVBEPostings.SKIP_INTERVAL], \
+        "block yang tidak memuat kandidat tidak boleh di-decode"
+
+    assert canonical_query(["b", "a", "AND", "c", "AND"]) == canonical_query(["a", "c", "b", "AND", "AND"]) \
+        == ('AND', ('a', 'b', 'c')), "canonical_query salah"
+    assert canonical_query(["a", "b", "DIFF"]) != canonical_query(["b", "a", "DIFF"]), "DIFF tidak komutatif"
+    assert canonical_query(["a", "a", "OR"]) == "a", "OR idempoten"
@@ -1,24 +1,107 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+
 from bsbi import BSBIIndex
-from compression import VBEPostings, EliasGammaPostings
-
-# sebelumnya sudah dilakukan indexing
-# BSBIIndex hanya sebagai abstraksi untuk index tersebut
-BSBI_instance = BSBIIndex(data_path = 'collection', \
-                          postings_encoding = VBEPostings, \
-                          output_path = 'index')
-
-# untuk menggunakan index hasil Elias-Gamma encoding, dapat
-# uncomment untuk potongan kode berikut
-"""
-BSBI_instance = BSBIIndex(data_path = 'collection', \
-                          postings_encoding = EliasGammaPostings, \
-                          output_path = 'index_eg')
-""" 
-
-queries = ["pupil mata", "aktor", "batu permata"]
-for query in queries:
-    print("Query  : ", query)
-    print("Results:")
-    for doc in BSBI_instance.boolean_retrieve(query):
-        print(doc)
-    print()
\ No newline at end of file
+from searcher import Searcher
+from compression import VBEPostings, EliasGammaPostings, HybridPostings, SkipVBEPostings, StandardPostings
+from util import STOP_WORDS_FILENAME, fetch_stop_words
+
+
+def read_queries(file):
+    """
+    Membaca query dari file, satu query per baris. Baris berupa JSON (JSONL)
+    boleh berisi string, atau object dengan key "query" (dan opsional "id");
+    baris lain, termasuk yang bukan JSON valid seperti '"foo" AND bar',
+    dianggap sebagai query biasa. Baris kosong dilewati.
+
+    Yields
+    ------
+    (id, str)
+        id query (nomor baris jika tidak ada) dan query-nya
+    """
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        query_id, query = line_number, line
+        if line[0] in '{"':
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = line
+            if isinstance(record, dict):
+                query_id, query = record.get('id', line_number), record['query']
+            else:
+                query = record
+        yield query_id, query
+
+
+def run_batch(searcher, query_file, output_file, batch_size=1000):
+    """
+    Menjalankan semua query di query_file dengan Searcher.retrieve_many(...),
+    batch_size query sekaligus, dan menuliskan hasilnya ke output_file
+    sebagai JSONL ({"id", "query", "results"}) segera setelah setiap batch
+    selesai.
+    """
+    queries = read_queries(query_file)
+    while True:
+        batch = list(itertools.islice(queries, batch_size))
+        if not batch:
+            break
+        results = searcher.retrieve_many([query for _, query in batch])
+        for (query_id, query), docs in zip(batch, results):
+            output_file.write(json.dumps({'id': query_id, 'query': query, 'results': docs}) + '\n')
+        output_file.flush()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Boolean retrieval terhadap index yang sudah dibangun")
+    parser.add_argument('--queries', help="file query (JSONL atau satu query per baris), '-' untuk stdin")
+    parser.add_argument('--output', default='-', help="file hasil (JSONL), default stdout")
+    parser.add_argument('--batch-size', type=int, default=1000, help="banyaknya query per batch")
+    parser.add_argument('--index', default='index', help="direktori index")
+    parser.add_argument('--fetch-stop-words', action='store_true',
+                        help="unduh stopwords dari GitHub ke directory project lalu keluar; dibutuhkan "
+                             "sekali sebelum indexing (index perlu dibangun ulang jika daftarnya berubah)")
+    parser.add_argument('--encoding', default='VBEPostings',
+                        choices=['StandardPostings', 'VBEPostings', 'EliasGammaPostings', 'SkipVBEPostings',
+                                 'HybridPostings'],
+                        help="postings encoding yang dipakai index")
+    args = parser.parse_args()
+
+    if args.fetch_stop_words:
+        stop_words_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), STOP_WORDS_FILENAME)
+        fetch_stop_words(stop_words_path)
+        print(f"Stopwords disimpan ke {stop_words_path}")
+        sys.exit(0)
+
+    # sebelumnya sudah dilakukan indexing
+    # BSBIIndex hanya sebagai abstraksi untuk index tersebut
+    # (untuk index hasil Elias-Gamma encoding: --index index_eg --encoding EliasGammaPostings)
+    BSBI_instance = BSBIIndex(data_path = 'collection', \
+                              postings_encoding = globals()[args.encoding], \
+                              output_path = args.index)
+
+    # index cukup dibuka sekali untuk semua query
+    with Searcher(BSBI_instance) as searcher:
+        if args.queries is None:
+            queries = ["pupil mata", "aktor", "batu permata"]
+            for query in queries:
+                print("Query  : ", query)
+                print("Results:")
+                for doc in searcher.retrieve(query):
+                    print(doc)
+                print()
+        else:
+            query_file = sys.stdin if args.queries == '-' else open(args.queries)
+            output_file = sys.stdout if args.output == '-' else open(args.output, 'w')
+            try:
+                run_batch(searcher, query_file, output_file, args.batch_size)
+            finally:
+                if query_file is not sys.stdin:
+                    query_file.close()
+                if output_file is not sys.stdout:
+                    output_file.close()
@@ -0,0 +1,393 @@
+import itertools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from index import InvertedIndexReader, PostingsCache, SegmentedIndexReader
+from planner import build_plan, canonical_query, diff_postings
+from util import QueryParser
+
+
+def parse_query(query, stemmer, stop_words):
+    """
+    Mem-parse query dengan QueryParser dan mengembalikan ekspresi postfix
+    (dengan token yang sudah di-stem). Mengembalikan None (dan mencetak
+    pesan ke stderr, supaya tidak tercampur dengan hasil di stdout) jika
+    query tidak valid karena mengandung stopwords.
+    """
+    qp = QueryParser(query, stemmer, stop_words)
+    if not qp.is_valid():
+        print("Query tidak valid karena mengandung stopwords.", file=sys.stderr)
+        return None
+    return qp.infix_to_postfix()
+
+
+class QueryResultCache:
+    """
+    Cache hasil boolean retrieval, dengan key bentuk kanonik dari ekspresi
+    postfix (lihat planner.canonical_query), sehingga "a AND b" dan "b AND a"
+    memakai entry yang sama. Generation index (lihat
+    BSBIIndex.index_generation()) menjadi bagian dari key, sehingga hasil
+    dari index sebelum dibangun ulang tidak pernah dikembalikan untuk
+    generation yang baru. Searcher lama yang masih memakai generation
+    sebelumnya juga tidak membuang entry milik generation yang baru; entry
+    generation lama akan terbuang sendiri oleh LRU.
+
+    Attributes
+    ----------
+    max_entries: int
+        Banyaknya query maksimum di cache; jika penuh, query yang paling lama
+        tidak dipakai (LRU) dibuang. 0 berarti cache tidak aktif.
+    ttl: float atau None
+        Umur maksimum sebuah entry dalam detik; None berarti tidak kedaluwarsa
+    """
+    def __init__(self, max_entries=1024, ttl=None, timer=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timer = timer
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Mengosongkan cache dan mereset statistik."""
+        with self.lock:
+            # (generation, key) -> (waktu disimpan, tuple of dokumen)
+            self.entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, generation):
+        """
+        Mengembalikan hasil query (list of dokumen) untuk key pada generation
+        index tersebut, atau None jika tidak ada di cache atau sudah kedaluwarsa.
+        """
+        if self.max_entries <= 0:
+            return None
+        key = (generation, key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and self.timer() - entry[0] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return list(entry[1])
+
+    def put(self, key, generation, result):
+        """Menyimpan hasil query untuk key pada generation index tersebut."""
+        if self.max_entries <= 0:
+            return
+        key = (generation, key)
+        with self.lock:
+            self.entries[key] = (self.timer(), tuple(result))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        """Mengembalikan statistik cache: hits, misses, hit_rate, entries."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / total if total else 0.0,
+                    'entries': len(self.entries)}
+
+
+class Searcher:
+    """
+    Objek untuk melakukan boolean retrieval berkali-kali terhadap index yang
+    sama. Berbeda dengan BSBIIndex.boolean_retrieve(...) yang memuat ulang
+    semuanya di setiap query, Searcher memuat terms.dict, docs.dict,
+    stemmer, stopwords, dan membuka InvertedIndexReader cukup sekali, lalu
+    index tetap terbuka untuk banyak query.
+
+    Index boleh dibangun ulang (BSBIIndex.start_indexing, add_documents, compact)
+    selagi Searcher terbuka: file index selalu ditulis ke file sementara
+    lalu di-rename, sehingga mmap milik Searcher tetap menunjuk ke index
+    lama yang utuh. Panggil reload() untuk mulai memakai index yang baru.
+
+    Contoh:
+        with Searcher(BSBI_instance) as searcher:
+            for query in queries:
+                print(searcher.retrieve(query))
+
+    Attributes
+    ----------
+    bsbi_index: BSBIIndex
+        Abstraksi untuk index yang sudah dibangun (output_path,
+        postings_encoding, index_name, stemmer, dan stopwords diambil dari sini)
+    term_id_map(IdMap): Untuk mapping terms ke termIDs
+    doc_id_map(IdMap): Untuk mapping docIDs ke path dokumen
+    index(InvertedIndexReader atau SegmentedIndexReader): Reader index yang
+        sedang terbuka (SegmentedIndexReader jika index terdiri dari
+        beberapa segment)
+    cache(PostingsCache): Cache postings yang sudah di-decode (None jika
+        cache_bytes = 0). Statistiknya bisa dilihat lewat cache.stats()
+    result_cache(QueryResultCache): Cache hasil query milik bsbi_index
+    tombstones(RoaringBitmap): docID dokumen yang sudah dihapus (lihat
+        BSBIIndex.delete_documents), atau None jika tidak ada
+    generation: Generation index saat dibuka (lihat BSBIIndex.index_generation())
+    """
+
+    def __init__(self, bsbi_index, cache_bytes=0, cache_policy='lru'):
+        self.bsbi_index = bsbi_index
+        self.index = None
+        self.cache = PostingsCache(cache_bytes, cache_policy) if cache_bytes > 0 else None
+        self.open()
+
+    def open(self):
+        """Memuat metadata dan membuka semua segment index. Dipanggil otomatis oleh constructor."""
+        bsbi_index = self.bsbi_index
+        # Diambil sebelum index dibaca, supaya hasil yang di-cache tidak
+        # pernah lebih baru dari generation yang dicatat
+        self.generation = bsbi_index.index_generation()
+        self.result_cache = bsbi_index.result_cache
+        bsbi_index.load()
+        self.term_id_map = bsbi_index.term_id_map
+        self.doc_id_map = bsbi_index.doc_id_map
+        self.stemmer = bsbi_index.stemmer
+        self.stop_words = bsbi_index.get_stop_words()
+        # Jika semua tombstones sudah di-purge oleh compact(), hasil query tidak perlu difilter
+        tombstones = bsbi_index.load_tombstones()
+        self.tombstones = tombstones if len(tombstones) > bsbi_index.load_manifest()['purged'] else None
+
+        # Query dijalankan terhadap semua segment yang aktif (lihat BSBIIndex.add_documents)
+        readers = [InvertedIndexReader(segment_name, bsbi_index.postings_encoding,
+                                       bsbi_index.output_path, use_mmap=True, cache=self.cache)
+                   for segment_name in bsbi_index.segment_names()]
+        index = readers[0] if len(readers) == 1 else SegmentedIndexReader(readers)
+        self.index = index.__enter__()
+
+    def close(self):
+        """Menutup main index. Setelah ini, retrieve(...) tidak bisa dipanggil lagi sampai open()."""
+        if self.index is not None:
+            self.index.__exit__(None, None, None)
+            self.index = None
+
+    def reload(self):
+        """Menutup lalu membuka ulang index, misalnya setelah index dibangun ulang."""
+        self.close()
+        if self.cache is not None:
+            self.cache.clear()
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+    def get_postings_list(self, term):
+        """
+        Mengembalikan postings list untuk sebuah term (yang sudah di-stem).
+        Term yang tidak ada di collection menghasilkan list kosong, dan tidak
+        ditambahkan ke term_id_map. Jika index memakai skip pointers, yang
+        dikembalikan adalah SkipPostingsView (lazy).
+        """
+        term_id = self.term_id_map.get(term)
+        if term_id is None:
+            return []
+        return self.index.get_postings_view(term_id)
+
+    def plan(self, query):
+        """
+        Mem-parse query dan membangun query plan-nya (lihat planner.py).
+        Mengembalikan None jika query tidak valid karena mengandung stopwords.
+        """
+        postfix = self.parse(query)
+        if postfix is None:
+            return None
+        return self.plan_postfix(postfix)
+
+    def parse(self, query):
+        """Mem-parse query menjadi ekspresi postfix, lihat parse_query(...)."""
+        return parse_query(query, self.stemmer, self.stop_words)
+
+    def plan_postfix(self, postfix):
+        """Membangun query plan dari ekspresi postfix yang sudah di-parse."""
+        if self.index is None:
+            raise ValueError("Searcher sudah ditutup")
+        return build_plan(postfix, self.term_id_map, self.index.postings_dict, len(self.doc_id_map))
+
+    def retrieve(self, query, limit=None, offset=0):
+        """
+        Melakukan boolean retrieval untuk sebuah query. Lihat docstring
+        BSBIIndex.boolean_retrieve(...) untuk format query dan hasilnya.
+
+        Query dievaluasi lewat query plan: operand AND dievaluasi mulai dari
+        df terkecil, dan evaluasi berhenti lebih awal jika hasil sementara
+        sudah kosong. Jika limit atau offset diberikan, query dievaluasi
+        secara lazy (lihat retrieve_page) dan hanya halaman yang diminta yang
+        dikembalikan.
+
+        Parameters
+        ----------
+        query: str
+            Query tokens yang dipisahkan oleh spasi
+        limit: int atau None
+            Banyaknya dokumen maksimum yang dikembalikan; None berarti semua
+        offset: int
+            Banyaknya dokumen pertama (terurut berdasarkan docID) yang dilewati
+
+        Returns
+        ------
+        List[str]
+            Daftar dokumen terurut yang memenuhi query
+        """
+        postfix = self.parse(query)
+        if postfix is None:
+            return []
+        if limit is None and offset == 0:
+            return self.retrieve_postfix(postfix)
+        return self.retrieve_page(postfix, limit, offset)
+
+    def retrieve_page(self, postfix, limit=None, offset=0, lookup_cache=True):
+        """
+        Mengembalikan dokumen ke-offset hingga ke-(offset + limit - 1) dari
+        hasil sebuah ekspresi postfix. Jika hasil lengkapnya ada di
+        result_cache, halaman diambil dari sana. Jika tidak, query dievaluasi
+        secara lazy (QueryPlan.iterate dengan InvertedIndexReader.iter_postings):
+        decoding postings berhenti begitu halaman yang diminta terpenuhi, dan
+        hanya docID di halaman tersebut yang di-map ke path dokumen. Halaman
+        tidak disimpan ke result_cache.
+        """
+        stop = None if limit is None else offset + limit
+        if lookup_cache:
+            result = self.result_cache.get(canonical_query(postfix), self.generation)
+            if result is not None:
+                return result[offset:stop]
+
+        doc_ids = self.plan_postfix(postfix).iterate(self.index.iter_postings)
+        if self.tombstones is not None:
+            doc_ids = (doc_id for doc_id in doc_ids if doc_id not in self.tombstones)
+        return [self.doc_id_map[doc_id] for doc_id in itertools.islice(doc_ids, offset, stop)]
+
+    def has_match(self, query):
+        """
+        Mengecek apakah ada dokumen yang memenuhi query. Evaluasi berhenti
+        di dokumen pertama yang ditemukan.
+        """
+        return len(self.retrieve(query, limit=1)) > 0
+
+    def retrieve_postfix(self, postfix, lookup_cache=True):
+        """
+        Seperti retrieve(...), tetapi untuk ekspresi postfix yang sudah
+        di-parse. Hasilnya diambil dari result_cache jika ada, dan disimpan
+        ke result_cache jika belum. lookup_cache=False dipakai jika pemanggil
+        sudah memeriksa result_cache sendiri.
+        """
+        key = canonical_query(postfix)
+        if lookup_cache:
+            result = self.result_cache.get(key, self.generation)
+            if result is not None:
+                return result
+
+        docs = self.remove_deleted(self.plan_postfix(postfix).execute(self.index.get_postings_view))
+        result = []
+        for doc_id in docs:
+            result.append(self.doc_id_map[doc_id])
+
+        self.result_cache.put(key, self.generation, result)
+        return result
+
+    def remove_deleted(self, docs):
+        """
+        Membuang docID yang ada di tombstones dari hasil evaluasi query plan.
+        Setiap docID hasil cukup dicek ke bitmap, sehingga biayanya sebanding
+        dengan ukuran hasil, bukan dengan banyaknya dokumen yang dihapus.
+        """
+        if self.tombstones is None:
+            return docs
+        return diff_postings(docs, [self.tombstones])
+
+    def retrieve_many(self, queries):
+        """
+        Melakukan boolean retrieval untuk banyak query sekaligus. Semua query
+        di-parse dan di-plan terlebih dahulu, lalu postings dari gabungan
+        termID yang dibutuhkan dibaca (dan di-decode) masing-masing cukup
+        sekali, urut berdasarkan posisinya di index file (per segment, lihat
+        SegmentedIndexReader.get_postings_views), sehingga pembacaan index
+        menjadi sekuensial. Setelah itu setiap query dievaluasi
+        terhadap postings yang sudah dibaca tersebut.
+
+        Query yang hasilnya sudah ada di result_cache tidak dievaluasi ulang,
+        dan query yang ekuivalen di dalam satu batch hanya dievaluasi sekali.
+
+        Parameters
+        ----------
+        queries: Iterable[str]
+
+        Returns
+        -------
+        List[List[str]]
+            Hasil retrieve(...) untuk setiap query, dengan urutan yang sama
+        """
+        results = []
+        # key kanonik -> (plan, index-index hasil yang memakai plan tersebut)
+        pending = {}
+        for query in queries:
+            results.append([])
+            postfix = self.parse(query)
+            if postfix is None:
+                continue
+            key = canonical_query(postfix)
+            if key in pending:
+                pending[key][1].append(len(results) - 1)
+                continue
+            result = self.result_cache.get(key, self.generation)
+            if result is not None:
+                results[-1] = result
+                continue
+            pending[key] = (self.plan_postfix(postfix), [len(results) - 1])
+
+        term_ids = set()
+        for plan, _ in pending.values():
+            term_ids.update(plan.term_ids())
+        postings_pool = self.index.get_postings_views(term_ids)
+
+        for key, (plan, positions) in pending.items():
+            docs = self.remove_deleted(plan.execute(postings_pool.__getitem__))
+            result = [self.doc_id_map[doc_id] for doc_id in docs]
+            self.result_cache.put(key, self.generation, result)
+            for position in positions:
+                results[position] = list(result)
+        return results
+
+    def explain(self, query):
+        """
+        Mengevaluasi query lalu mencetak (dan mengembalikan) query plan yang
+        dipilih, beserta perkiraan dan ukuran hasil sebenarnya di setiap node.
+        """
+        plan = self.plan(query)
+        if plan is None:
+            return ''
+        plan.execute(self.index.get_postings_view)
+        explanation = plan.explain()
+        print(explanation)
+        return explanation
+
+
+if __name__ == '__main__':
+    now = [0.0]
+    cache = QueryResultCache(max_entries=2, ttl=10, timer=lambda: now[0])
+    cache.put(('AND', ('a', 'b')), 1, ['doc1.txt'])
+    assert cache.get(('AND', ('a', 'b')), 1) == ['doc1.txt'], "QueryResultCache salah"
+    assert cache.get(('AND', ('a', 'b')), 2) is None, "hasil generation lama tidak boleh dikembalikan"
+    cache.put(('AND', ('a', 'b')), 2, ['doc2.txt'])
+    cache.put(('AND', ('a', 'b')), 1, ['doc1.txt'])
+    assert cache.get(('AND', ('a', 'b')), 2) == ['doc2.txt'], "put generation lama membuang entry generation baru"
+    cache.put('a', 2, [])
+    now[0] = 11.0
+    assert cache.get('a', 2) is None, "entry yang kedaluwarsa tidak boleh dikembalikan"
+    for key in ('x', 'y', 'z'):
+        cache.put(key, 2, [key])
+    assert len(cache) == 2 and cache.get('x', 2) is None, "eviction LRU salah"
+    assert cache.stats()['hits'] == 2 and cache.stats()['entries'] == 2, "statistik QueryResultCache salah"
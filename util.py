@@ -1,3 +1,82 @@
+import array
+import bisect
+import heapq
+import os
+import pickle
+from collections import OrderedDict
+
+STOP_WORDS_URL = 'https://raw.githubusercontent.com/datascienceid/stopwords-bahasa-indonesia/master/stopwords_id_satya.txt'
+STOP_WORDS_FILENAME = 'stopwords_id_satya.txt'
+
+# Cache stopwords per file, supaya setiap file hanya di-parse sekali per process
+_stop_words_cache = {}
+
+
+def fetch_stop_words(file_path, url=STOP_WORDS_URL):
+    """
+    Mengambil daftar stopwords (Satya) dari GitHub dan menyimpannya ke
+    file_path. Tidak pernah dipanggil otomatis oleh indexing maupun query;
+    jalankan sekali secara eksplisit (python search.py --fetch-stop-words)
+    sebelum indexing. Jika daftarnya diperbarui, bangun ulang index supaya
+    stopwords indexing dan query sama.
+    """
+    import requests
+
+    r = requests.get(url)
+    r.raise_for_status()
+    # Tulis ke file sementara dulu lalu rename, supaya tidak ada file setengah jadi
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(r.text)
+    os.replace(tmp_path, file_path)
+
+
+def load_stop_words(index_path=None, fetch=False):
+    """
+    Memuat stopwords dari file lokal STOP_WORDS_FILENAME. File dicari di
+    directory index (index_path) terlebih dahulu, lalu di directory project.
+    Hasilnya di-parse sekali per process menjadi frozenset, sehingga indexer dan QueryParser memakai
+    objek yang sama. Baris kosong dan baris yang diawali '#' diabaikan.
+
+    Parameters
+    ----------
+    index_path: str
+        Directory index; boleh None
+    fetch: bool
+        Jika True dan file tidak ditemukan, stopwords diambil sekali dari
+        STOP_WORDS_URL lalu di-cache ke index_path (atau directory project
+        jika index_path None). Default False: tidak ada akses network.
+
+    Returns
+    -------
+    frozenset[str]
+        Himpunan stopwords
+    """
+    candidates = []
+    if index_path is not None:
+        candidates.append(os.path.join(index_path, STOP_WORDS_FILENAME))
+    candidates.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), STOP_WORDS_FILENAME))
+
+    for file_path in candidates:
+        file_path = os.path.abspath(file_path)
+        if file_path in _stop_words_cache:
+            return _stop_words_cache[file_path]
+        if os.path.isfile(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                stop_words = frozenset(line.strip() for line in f
+                                       if line.strip() and not line.startswith('#'))
+            _stop_words_cache[file_path] = stop_words
+            return stop_words
+
+    if not fetch:
+        raise FileNotFoundError(f"{STOP_WORDS_FILENAME} tidak ditemukan di {candidates}. Unduh sekali dengan "
+                                f"'python search.py --fetch-stop-words', atau salin file tersebut ke "
+                                f"directory project.")
+
+    fetch_stop_words(candidates[0])
+    return load_stop_words(index_path)
+
+
 class IdMap:
     """
     Ingat kembali di kuliah, bahwa secara praktis, sebuah dokumen dan
@@ -10,22 +89,70 @@ class IdMap:
     def __init__(self):
         """
         Mapping dari string (term atau nama dokumen) ke id disimpan dalam
-        python's dictionary; cukup efisien. Mapping sebaliknya disimpan dalam
-        python's list.
+        python's dictionary, sehingga lookup cukup O(1). Mapping sebaliknya
+        disimpan secara compact dalam sebuah string pool: semua string
+        di-encode UTF-8 dan disambung dalam satu bytearray, lalu posisi awal
+        masing-masing string dicatat di array offsets. Dengan begitu, tidak
+        perlu menyimpan satu objek str Python untuk setiap id.
 
         contoh:
             str_to_id["halo"] ---> 8
             str_to_id["/collection/dir0/gamma.txt"] ---> 54
 
-            id_to_str[8] ---> "halo"
-            id_to_str[54] ---> "/collection/dir0/gamma.txt"
+            pool[offsets[8]:offsets[9]] ---> b"halo"
+            pool[offsets[54]:offsets[55]] ---> b"/collection/dir0/gamma.txt"
         """
         self.str_to_id = {}
-        self.id_to_str = []
+        self._pool = bytearray()
+        self._offsets = array.array('L', [0])
 
     def __len__(self):
-        """Mengembalikan banyaknya term (atau dokumen) yang disimpan di IdMap."""
-        return len(self.str_to_id)
+        """
+        Mengembalikan banyaknya id yang sudah di-assign, yaitu banyaknya term
+        (atau dokumen) yang disimpan di IdMap, termasuk id lama dari string
+        yang sudah di-reassign(...).
+        """
+        return len(self._offsets) - 1
+
+    def __getstate__(self):
+        """
+        Yang di-pickle hanya string pool dan panjang tiap string. str_to_id
+        dan offsets dibangun ulang ketika di-load, sehingga terms.dict dan
+        docs.dict jauh lebih kecil.
+        """
+        offsets = self._offsets
+        lengths = [offsets[i + 1] - offsets[i] for i in range(len(offsets) - 1)]
+        max_length = max(lengths, default=0)
+        typecode = 'B' if max_length < 2 ** 8 else 'H' if max_length < 2 ** 16 else 'L'
+        return {'pool': bytes(self._pool), 'lengths': array.array(typecode, lengths)}
+
+    def __setstate__(self, state):
+        """Membangun ulang IdMap dari hasil __getstate__ (atau dari pickle format lama)."""
+        self.__init__()
+        if 'id_to_str' in state:
+            # Format lama: str_to_id (dict) dan id_to_str (list of str)
+            self.get_ids(state['id_to_str'])
+            return
+
+        self._pool = bytearray(state['pool'])
+        pool = self._pool
+        offsets = self._offsets
+        str_to_id = self.str_to_id
+        start = 0
+        # Jika sebuah string muncul lebih dari sekali (lihat reassign), id terbaru yang dipakai
+        for item_id, length in enumerate(state['lengths']):
+            end = start + length
+            str_to_id[pool[start:end].decode('utf-8')] = item_id
+            offsets.append(end)
+            start = end
+
+    def __add(self, s):
+        """Assign id baru untuk s, lalu simpan s ke str_to_id dan string pool."""
+        new_id = len(self._offsets) - 1
+        self.str_to_id[s] = new_id
+        self._pool += s.encode('utf-8')
+        self._offsets.append(len(self._pool))
+        return new_id
 
     def __get_id(self, s):
         """
@@ -33,21 +160,63 @@ class IdMap:
         Jika s tidak ada pada IdMap, lalu assign sebuah integer id baru dan kembalikan
         integer id baru tersebut.
         """
-        # Loop to find s in self.str_to_id. If s is found, return the id of s.
-        for (string, item_id) in self.str_to_id.items():
-            if string == s:
-                return item_id
-
-        # Assign new id to s (based on the current size of IdMap), insert to both
-        # str_to_id and id_to_str, return the newly-assigned id.
-        new_id = self.__len__()
-        self.str_to_id[s] = new_id
-        self.id_to_str.append(s)
-        return new_id
+        item_id = self.str_to_id.get(s)
+        if item_id is None:
+            item_id = self.__add(s)
+        return item_id
 
     def __get_str(self, i):
         """Mengembalikan string yang terasosiasi dengan index i."""
-        return self.id_to_str[i]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("IdMap index out of range")
+        return self._pool[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+
+    def reassign(self, s):
+        """
+        Meng-assign id baru untuk s walaupun s sudah ada di IdMap, lalu
+        mengembalikan id baru tersebut. Id lama tetap bisa di-resolve ke s,
+        tetapi str_to_id[s] selanjutnya menunjuk ke id yang baru. Dipakai
+        ketika dokumen yang sudah dihapus ditambahkan kembali.
+        """
+        return self.__add(s)
+
+    def get(self, s, default=None):
+        """
+        Mengembalikan id dari string s jika ada di IdMap, atau default jika
+        tidak ada. Berbeda dengan __getitem__, method ini tidak pernah
+        meng-assign id baru (berguna saat query).
+        """
+        return self.str_to_id.get(s, default)
+
+    def __contains__(self, s):
+        return s in self.str_to_id
+
+    def get_ids(self, strings):
+        """
+        Versi bulk dari __get_id: mengembalikan list id untuk setiap string di
+        strings (misalnya semua token dari satu dokumen), sekaligus assign id
+        baru untuk string yang belum ada di IdMap.
+
+        Parameters
+        ----------
+        strings: Iterable[str]
+
+        Returns
+        -------
+        List[int]
+            id untuk setiap string, dengan urutan yang sama dengan strings
+        """
+        str_to_id = self.str_to_id
+        add = self.__add
+        result = []
+        for s in strings:
+            item_id = str_to_id.get(s)
+            if item_id is None:
+                item_id = add(s)
+            result.append(item_id)
+        return result
 
     def __getitem__(self, key):
         """
@@ -68,6 +237,86 @@ class IdMap:
             # Return string if the provided key is an integer (id).
             return self.__get_str(key)
 
+class CachedStemmer:
+    """
+    Lapisan memoization di atas stemmer (misalnya MPStemmer). Token pada
+    teks natural sangat repetitif, sehingga hasil stemming untuk setiap
+    bentuk token (yang sudah di-lowercase) cukup dihitung sekali lalu
+    disimpan di cache. Cache dibatasi oleh capacity dengan eviction LRU,
+    dan dapat disimpan ke file agar bisa dipakai lagi di run berikutnya.
+
+    Attributes
+    ----------
+    stemmer
+        Objek stemmer yang di-wrap; harus punya method stem(str)
+    capacity: int
+        Banyaknya maksimum entry di cache
+    hits: int
+        Banyaknya pemanggilan stem(...) yang hasilnya sudah ada di cache
+    misses: int
+        Banyaknya pemanggilan stem(...) yang harus memanggil stemmer asli
+    """
+    FILENAME = 'stem_cache.pickle'
+
+    def __init__(self, stemmer=None, capacity=200000):
+        if stemmer is None:
+            from mpstemmer import MPStemmer
+            stemmer = MPStemmer()
+        self.stemmer = stemmer
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.cache)
+
+    def stem(self, token):
+        """Mengembalikan hasil stemming dari token.lower(), memakai cache jika ada."""
+        token = token.lower()
+        cache = self.cache
+        stemmed = cache.get(token)
+        if stemmed is not None:
+            self.hits += 1
+            cache.move_to_end(token)
+            return stemmed
+
+        self.misses += 1
+        stemmed = self.stemmer.stem(token)
+        cache[token] = stemmed
+        if len(cache) > self.capacity:
+            # Buang entry yang paling lama tidak dipakai
+            cache.popitem(last=False)
+        return stemmed
+
+    def stats(self):
+        """Mengembalikan statistik cache: hits, misses, hit_rate, dan size."""
+        total = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self.cache)}
+
+    def save(self, file_path):
+        """Menyimpan isi cache (urut dari yang paling lama dipakai) ke file_path via pickle."""
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(list(self.cache.items()), f)
+        os.replace(tmp_path, file_path)
+
+    def load(self, file_path):
+        """Memuat isi cache dari file_path (jika ada), dengan tetap menghormati capacity."""
+        if not os.path.isfile(file_path):
+            return
+        with open(file_path, 'rb') as f:
+            items = pickle.load(f)
+        cache = self.cache
+        cache.update(items[-self.capacity:] if self.capacity > 0 else [])
+        while len(cache) > self.capacity:
+            # Cache sudah berisi sebelum load; buang entry yang paling lama tidak dipakai
+            cache.popitem(last=False)
+
+
 class QueryParser:
     """
     Class untuk melakukan parsing query untuk boolean search
@@ -109,7 +358,7 @@ class QueryParser:
             query yang sudah di-parse
         """        
         result = []
-        for token in self.query_list:
+        for token in self.query.split():
             while token[0] == "(":
                 result.append(token[0])
                 token = token[1:]
@@ -145,7 +394,7 @@ class QueryParser:
         list[str]
             list yang berisi token dalam ekspresi postfix
         """
-        precedence = {'NOT': 1, 'AND': 1, 'OR': 1}
+        precedence = {'DIFF': 1, 'AND': 1, 'OR': 1}
         output_queue = []
         operator_stack = []
         
@@ -168,6 +417,8 @@ class QueryParser:
         while operator_stack:
             output_queue.append(operator_stack.pop())
 
+        return output_queue
+
 def sort_intersect_list(list_A, list_B):
     """
     Intersects two (ascending) sorted lists and returns the sorted result
@@ -303,6 +554,352 @@ def sort_diff_list(list_A, list_B):
 
     return answer    
 
+def _gallop(list_B, x, lo):
+    """
+    Mencari posisi pertama di list_B[lo:] yang nilainya >= x dengan
+    galloping (exponential search): lompat 1, 2, 4, 8, ... posisi ke depan
+    hingga melewati x, lalu binary search pada rentang terakhir.
+    """
+    n = len(list_B)
+    bound = 1
+    while lo + bound < n and list_B[lo + bound] < x:
+        bound *= 2
+    return bisect.bisect_left(list_B, x, lo, min(lo + bound + 1, n))
+
+
+def gallop_intersect_list(list_A, list_B):
+    """
+    Melakukan intersection dua (ascending) sorted lists dengan galloping:
+    untuk setiap elemen list yang lebih pendek, posisinya di list yang lebih
+    panjang dicari dengan exponential search. Waktunya sebanding dengan
+    len(list pendek) * log(len(list panjang)), sehingga cocok jika panjang
+    kedua list sangat berbeda.
+
+    Parameters
+    ----------
+    list_A: List[Comparable]
+    list_B: List[Comparable]
+        Dua buah sorted list yang akan di-intersect.
+
+    Returns
+    -------
+    List[Comparable]
+        intersection yang sudah terurut
+    """
+    if len(list_A) > len(list_B):
+        list_A, list_B = list_B, list_A
+
+    answer = []
+    pointer_B = 0
+    length_B = len(list_B)
+    for value in list_A:
+        pointer_B = _gallop(list_B, value, pointer_B)
+        if pointer_B >= length_B:
+            break
+        if list_B[pointer_B] == value:
+            answer.append(value)
+    return answer
+
+
+def gallop_diff_list(list_A, list_B):
+    """
+    Melakukan difference dua (ascending) sorted lists (list_A - list_B)
+    dengan galloping pada list_B. Cocok jika list_B jauh lebih panjang
+    daripada list_A.
+
+    Parameters
+    ----------
+    list_A: List[Comparable]
+    list_B: List[Comparable]
+        Dua buah sorted list yang akan di-difference.
+
+    Returns
+    -------
+    List[Comparable]
+        difference yang sudah terurut
+    """
+    answer = []
+    pointer_B = 0
+    length_B = len(list_B)
+    for value in list_A:
+        pointer_B = _gallop(list_B, value, pointer_B)
+        if pointer_B >= length_B or list_B[pointer_B] != value:
+            answer.append(value)
+    return answer
+
+
+def _skip_probe(list_A, postings_view, keep_found):
+    """
+    Untuk setiap elemen list_A, cek apakah elemen tersebut ada di
+    postings_view (lihat compression.SkipPostingsView) dengan binary search
+    pada skip entries lalu pada satu block saja. Hanya block yang disinggahi
+    yang di-decode.
+    """
+    block_firsts = postings_view.block_firsts
+    if block_firsts is None:
+        # Hanya satu block, tidak ada yang bisa di-skip
+        block = postings_view.block(0)
+        if keep_found:
+            return gallop_intersect_list(list_A, block)
+        return gallop_diff_list(list_A, block)
+
+    answer = []
+    current_block_index = -1
+    block = None
+    position = 0
+    for value in list_A:
+        block_index = bisect.bisect_right(block_firsts, value, max(current_block_index, 0)) - 1
+        found = False
+        if block_index >= 0:
+            if block_index != current_block_index:
+                block = postings_view.block(block_index)
+                current_block_index = block_index
+                position = 0
+            position = bisect.bisect_left(block, value, position)
+            found = position < len(block) and block[position] == value
+        if found == keep_found:
+            answer.append(value)
+    return answer
+
+
+def skip_intersect_list(list_A, postings_view):
+    """
+    Intersection sebuah sorted list (biasanya pendek) dengan postings list
+    panjang yang disimpan dengan skip pointers (compression.SkipPostingsView).
+    Waktunya sebanding dengan len(list_A), karena hanya block yang memuat
+    kandidat docID yang di-decode.
+
+    Returns
+    -------
+    List[int]
+        intersection yang sudah terurut
+    """
+    return _skip_probe(list_A, postings_view, keep_found=True)
+
+
+def skip_diff_list(list_A, postings_view):
+    """
+    Difference (list_A - postings_view) antara sebuah sorted list dan
+    postings list yang disimpan dengan skip pointers. Lihat skip_intersect_list.
+
+    Returns
+    -------
+    List[int]
+        difference yang sudah terurut
+    """
+    return _skip_probe(list_A, postings_view, keep_found=False)
+
+
+def intersect_many(lists):
+    """
+    Melakukan intersection k buah (ascending) sorted lists sekaligus dalam
+    satu pass. List terpendek menjadi "driver": setiap elemennya dicari di
+    list-list lain (urut dari yang terpendek) dengan galloping, dan setiap
+    list memiliki pointer yang hanya bergerak maju. Tidak ada hasil
+    intersection sementara yang dibangun.
+
+    Parameters
+    ----------
+    lists: List[List[Comparable]]
+        Sorted lists yang akan di-intersect
+
+    Returns
+    -------
+    List[Comparable]
+        intersection yang sudah terurut
+    """
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    driver, others = lists[0], lists[1:]
+    pointers = [0] * len(others)
+    answer = []
+    for value in driver:
+        for i, other in enumerate(others):
+            pointers[i] = _gallop(other, value, pointers[i])
+            if pointers[i] >= len(other):
+                # Salah satu list sudah habis, tidak mungkin ada hasil lagi
+                return answer
+            if other[pointers[i]] != value:
+                break
+        else:
+            answer.append(value)
+    return answer
+
+
+def union_many(lists):
+    """
+    Melakukan union k buah (ascending) sorted lists sekaligus dalam satu
+    pass dengan k-way merge berbasis heap (heapq.merge); duplikat dibuang
+    saat merging, sehingga tidak ada hasil union sementara yang dibangun.
+
+    Parameters
+    ----------
+    lists: List[List[Comparable]]
+        Sorted lists yang akan di-union
+
+    Returns
+    -------
+    List[Comparable]
+        union yang sudah terurut
+    """
+    if len(lists) == 1:
+        return list(lists[0])
+    answer = []
+    last = None
+    for value in heapq.merge(*lists):
+        if value != last:
+            answer.append(value)
+            last = value
+    return answer
+
+
+def diff_many(list_A, lists):
+    """
+    Melakukan difference list_A - (lists[0] U lists[1] U ...) dalam satu
+    pass: setiap elemen list_A dicari di setiap list pengurang dengan
+    galloping (pointer setiap list hanya bergerak maju), tanpa membangun
+    union dari list-list pengurang.
+
+    Parameters
+    ----------
+    list_A: List[Comparable]
+    lists: List[List[Comparable]]
+        Sorted lists pengurang
+
+    Returns
+    -------
+    List[Comparable]
+        difference yang sudah terurut
+    """
+    lists = [other for other in lists if len(other) > 0]
+    pointers = [0] * len(lists)
+    answer = []
+    for value in list_A:
+        found = False
+        for i, other in enumerate(lists):
+            pointers[i] = _gallop(other, value, pointers[i])
+            if pointers[i] < len(other) and other[pointers[i]] == value:
+                found = True
+                break
+        if not found:
+            answer.append(value)
+    return answer
+
+
+class PostingsCursor:
+    """
+    Cursor yang hanya bergerak maju di atas postings terurut, dipakai oleh
+    iter_intersect. seek(target) mengembalikan docID pertama yang >= target
+    dengan cara yang paling murah untuk representasi postings-nya:
+
+    - list/array (misalnya postings dari cache): galloping, lihat _gallop
+    - postings dengan skip pointers (compression.SkipPostingsView): block
+      yang dilewati di-skip lewat skip entries tanpa di-decode, lalu
+      galloping di dalam block
+    - iterator lainnya (misalnya generator VBEPostings.iter_decode): tidak
+      bisa melompat, sehingga dimajukan satu per satu
+    """
+    def __init__(self, postings):
+        self.view = None
+        self.iterator = None
+        self.block_index = 0
+        self.position = 0
+        self.current = None
+        if hasattr(postings, 'block_firsts'):
+            # Jika hanya satu block, view cukup diperlakukan seperti array
+            if postings.block_firsts is not None:
+                self.view = postings
+            self.items = postings.block(0)
+        elif isinstance(postings, (list, array.array)):
+            self.items = postings
+        else:
+            self.iterator = iter(postings)
+
+    def seek(self, target):
+        """Memajukan cursor ke docID pertama yang >= target; raise StopIteration jika postings habis."""
+        if self.iterator is not None:
+            if self.current is None:
+                self.current = next(self.iterator)
+            while self.current < target:
+                self.current = next(self.iterator)
+            return self.current
+
+        view = self.view
+        if view is not None:
+            block_firsts = view.block_firsts
+            if self.block_index + 1 < len(block_firsts) and block_firsts[self.block_index + 1] <= target:
+                self.block_index = bisect.bisect_right(block_firsts, target, self.block_index) - 1
+                self.items = view.block(self.block_index)
+                self.position = 0
+        self.position = _gallop(self.items, target, self.position)
+        if self.position >= len(self.items):
+            if view is None or self.block_index + 1 >= len(view.block_firsts):
+                raise StopIteration
+            # docID pertama block berikutnya pasti > target
+            self.block_index += 1
+            self.items = view.block(self.block_index)
+            self.position = 0
+        self.current = self.items[self.position]
+        return self.current
+
+
+def iter_intersect(iterators):
+    """
+    Versi lazy dari intersect_many: generator yang menghasilkan intersection
+    dari k buah postings docIDs terurut (leapfrog). Setiap operand dibungkus
+    PostingsCursor, sehingga operand yang panjang dilompati dengan galloping
+    atau skip pointers jika representasinya memungkinkan, dan hanya
+    dimajukan sejauh yang diperlukan: jika pemanggil berhenti lebih awal,
+    sisa postings tidak pernah dibaca. Operand sebaiknya terurut dari yang
+    terpendek (operand pertama menjadi driver).
+    """
+    cursors = [PostingsCursor(postings) for postings in iterators]
+    if not cursors:
+        return
+    try:
+        target = 0
+        while True:
+            matched = True
+            for cursor in cursors:
+                value = cursor.seek(target)
+                if value > target:
+                    target = value
+                    matched = False
+            if matched:
+                yield target
+                target += 1
+    except StopIteration:
+        return
+
+
+def iter_union(iterators):
+    """
+    Versi lazy dari union_many: generator yang menghasilkan union dari k
+    buah iterator docIDs terurut dengan heapq.merge (yang juga lazy).
+    """
+    last = None
+    for value in heapq.merge(*iterators):
+        if value != last:
+            yield value
+            last = value
+
+
+def iter_diff(iterator_A, iterators):
+    """
+    Versi lazy dari diff_many: generator yang menghasilkan docIDs dari
+    iterator_A yang tidak ada di iterator-iterator lain. Iterator pengurang
+    di-merge secara lazy dan hanya dimajukan hingga docID yang sedang dicek.
+    """
+    subtrahends = heapq.merge(*iterators)
+    current = next(subtrahends, None)
+    for value in iterator_A:
+        while current is not None and current < value:
+            current = next(subtrahends, None)
+        if current != value:
+            yield value
+
+
 if __name__ == '__main__':
     doc = ["halo", "semua", "selamat", "pagi", "semua"]
     term_id_map = IdMap()
@@ -317,6 +914,16 @@ if __name__ == '__main__':
             "/collection/1/data53.txt"]
     doc_id_map = IdMap()
     assert [doc_id_map[docname] for docname in docs] == [0, 1, 2], "docs_id salah"
+    assert doc_id_map.reassign(docs[1]) == 3 and doc_id_map[docs[1]] == 3 and doc_id_map[1] == docs[1], \
+        "reassign salah"
+    restored = pickle.loads(pickle.dumps(doc_id_map))
+    assert len(restored) == 4 and restored[docs[1]] == 3 and restored["/collection/2/data1.txt"] == 4, \
+        "pickle IdMap setelah reassign salah"
+
+    assert term_id_map.get_ids(["pagi", "sore", "halo"]) == [3, 4, 0], "get_ids salah"
+    restored = pickle.loads(pickle.dumps(term_id_map))
+    assert len(restored) == 5 and restored["sore"] == 4 and restored[2] == "selamat", "pickle IdMap salah"
+    assert restored["malam"] == 5 and restored[-1] == "malam", "pickle IdMap salah"
 
     assert sort_intersect_list([1, 2, 3], [2, 3]) == [2, 3], "sorted_intersect salah"
     assert sort_intersect_list([4, 5], [1, 4, 7]) == [4], "sorted_intersect salah"
@@ -330,9 +937,63 @@ if __name__ == '__main__':
     assert sort_diff_list([4, 5], [1, 4, 7]) == [5], "sorted_diff salah"
     assert sort_diff_list([], []) == [], "sorted_diff salah"
 
+    long_list = list(range(0, 100000, 3))
+    assert gallop_intersect_list([2, 3, 99999, 200000], long_list) == [3, 99999], "gallop_intersect salah"
+    assert gallop_intersect_list(long_list, []) == [], "gallop_intersect salah"
+    assert gallop_diff_list([2, 3, 99999, 200000], long_list) == [2, 200000], "gallop_diff salah"
+
+    assert intersect_many([long_list, [3, 6, 7, 99999], [0, 3, 99999, 100000]]) == [3, 99999], "intersect_many salah"
+    assert intersect_many([[1, 2], []]) == [] and intersect_many([[1, 2]]) == [1, 2], "intersect_many salah"
+    assert union_many([[1, 4], [2, 4, 9], [], [0, 9]]) == [0, 1, 2, 4, 9], "union_many salah"
+    assert diff_many([1, 2, 3, 4, 5], [[2, 9], [], [1, 5]]) == [3, 4], "diff_many salah"
+    assert list(iter_intersect([iter(long_list), [3, 6, 7, 99999], [0, 3, 99999, 100000]])) == [3, 99999], \
+        "iter_intersect salah"
+    assert list(iter_union([[1, 4], iter([2, 4, 9]), [], [0, 9]])) == [0, 1, 2, 4, 9], "iter_union salah"
+    assert list(iter_diff(iter([1, 2, 3, 4, 5]), [[2, 9], [], [1, 5]])) == [3, 4], "iter_diff salah"
+    consumed = iter(long_list)
+    assert next(iter_intersect([consumed, [0, 3, 6]])) == 0 and next(consumed) == 3, "iter_intersect tidak lazy"
+    cursor = PostingsCursor(array.array('L', long_list))
+    assert cursor.seek(4) == 6 and cursor.seek(6) == 6 and cursor.seek(99998) == 99999, "PostingsCursor salah"
+    try:
+        cursor.seek(100000)
+        assert False, "PostingsCursor harus habis"
+    except StopIteration:
+        pass
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, STOP_WORDS_FILENAME), 'w', encoding='utf-8') as f:
+            f.write("# komentar\nyang\n\ndan\n")
+        assert load_stop_words(tmp_dir) == frozenset(["yang", "dan"]), "load_stop_words salah"
+
+    from compression import SkipVBEPostings
+    long_view = SkipVBEPostings.view(SkipVBEPostings.encode(long_list))
+    assert skip_intersect_list([2, 3, 99999, 200000], long_view) == [3, 99999], "skip_intersect salah"
+    assert skip_diff_list([2, 3, 99999, 200000], long_view) == [2, 200000], "skip_diff salah"
+
+    class UpperStemmer:
+        def stem(self, token):
+            return token.upper()
+
+    stemmer = CachedStemmer(UpperStemmer(), capacity=2)
+    assert [stemmer.stem(token) for token in ["Halo", "halo", "semua", "pagi", "halo"]] == \
+           ["HALO", "HALO", "SEMUA", "PAGI", "HALO"], "stemming cache salah"
+    assert stemmer.stats()["hits"] == 1 and stemmer.stats()["misses"] == 4, "statistik stemming cache salah"
+    assert list(stemmer.cache) == ["pagi", "halo"], "eviction LRU salah"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, CachedStemmer.FILENAME)
+        stemmer.save(cache_path)
+        other_stemmer = CachedStemmer(UpperStemmer(), capacity=2)
+        other_stemmer.stem("malam")
+        other_stemmer.load(cache_path)
+        assert list(other_stemmer.cache) == ["pagi", "halo"], "load stemming cache melebihi capacity"
+
     from mpstemmer import MPStemmer
     qp = QueryParser("((term1 AND term2) OR term3) DIFF (term6 AND (term4 OR term5) DIFF (term7 OR term8))", MPStemmer(), set(["term1"]))
     assert qp.query_string_to_list() == ['(', '(', 'term1', 'AND', 'term2', ')', 'OR', 'term3', ')', 
                                      'DIFF', '(', 'term6', 'AND', '(', 'term4', 'OR', 'term5', 
                                      ')', 'DIFF', '(', 'term7', 'OR', 'term8', ')', ')'], "parsing to list salah"
-    print(qp.preprocess_tokens())
\ No newline at end of file
+    print(qp.preprocess_tokens())
+
+    qp = QueryParser("term1 AND (term2 OR term3) DIFF term4", UpperStemmer(), set())
+    assert qp.infix_to_postfix() == ['TERM1', 'TERM2', 'TERM3', 'OR', 'AND', 'TERM4', 'DIFF'], "infix to postfix salah"